@@ -0,0 +1,165 @@
+import threading
+import time
+from collections import OrderedDict, deque
+from concurrent.futures import Future, as_completed
+
+import instrumentation
+
+DEFAULT_MAX_WAIT_MS = 5.0  # How long the first item of a batch waits for company
+DEFAULT_MAX_BATCH = 8  # Chunks per model call, as main.BATCH_SIZE
+LATENCY_WINDOW = 10000  # Most recent items kept for the percentile metrics
+
+
+def percentile(values, pct):
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(round(pct / 100 * (len(ordered) - 1))))]
+
+
+def summarize(values):
+    if not values:
+        return None
+    return {
+        "p50": round(percentile(values, 50), 4),
+        "p95": round(percentile(values, 95), 4),
+        "p99": round(percentile(values, 99), 4),
+        "max": round(max(values), 4)
+    }
+
+
+class _Item():
+    def __init__(self, question_type, profile, context):
+        self.question_type = question_type
+        self.profile = profile
+        self.context = context
+        self.future = Future()
+        self.enqueued = time.monotonic()
+
+
+# Dynamic batching in front of a QuestionGenerator for concurrent requests (--serve).
+# Callers submit (question_type, chunk) items; one thread collects items with the same
+# question type and profile until max_batch of them are waiting or the oldest has waited
+# max_wait_ms, runs them as a single generate_batch() call and resolves each caller's Future.
+# iter_generate/generate_batch mirror QuestionGenerator, so iter_questions can use either.
+class BatchScheduler():
+    def __init__(self, qg, max_wait_ms: float = DEFAULT_MAX_WAIT_MS, max_batch: int = DEFAULT_MAX_BATCH):
+        self.qg = qg
+        self.max_wait = max_wait_ms / 1000
+        self.max_batch = max(1, max_batch)
+        self._groups = OrderedDict()  # (question_type, profile) -> deque of waiting items
+        self._changed = threading.Condition()
+        self._closed = False
+        self._queue_waits = deque(maxlen=LATENCY_WINDOW)
+        self._latencies = deque(maxlen=LATENCY_WINDOW)
+        self._batch_sizes = deque(maxlen=LATENCY_WINDOW)
+        self._batch_seconds = deque(maxlen=LATENCY_WINDOW)
+        self._counts = {"items": 0, "batches": 0, "failed_batches": 0, "cancelled": 0}
+        self._thread = threading.Thread(target=self._run, name='qg-batch-scheduler', daemon=True)
+        self._thread.start()
+
+    # One Future per context, resolving to that context's raw model output
+    def submit(self, question_type: str, contexts: list, profile: str = None) -> list:
+        items = [_Item(question_type, profile, context) for context in contexts]
+        with self._changed:
+            if self._closed:
+                raise RuntimeError("Batch scheduler is closed")
+            self._groups.setdefault((question_type, profile), deque()).extend(items)
+            self._changed.notify_all()
+        return [item.future for item in items]
+
+    # Yields (index, output) as each item's batch finishes. batch_size is accepted for
+    # compatibility; batches are sized by max_batch across every caller instead.
+    def iter_generate(self, question_type: str, contexts: list, batch_size: int = None, profile: str = None):
+        futures = self.submit(question_type, contexts, profile)
+        indices = {future: i for i, future in enumerate(futures)}
+        try:
+            for future in as_completed(futures):
+                yield indices[future], future.result()
+        finally:
+            # Abandoned early (e.g. a cancelled job): drop whatever has not started yet
+            for future in futures:
+                future.cancel()
+
+    def generate_batch(self, question_type: str, contexts: list, batch_size: int = None, profile: str = None) -> list:
+        return [future.result() for future in self.submit(question_type, contexts, profile)]
+
+    def stats(self) -> dict:
+        with self._changed:
+            return {
+                "max_wait_ms": self.max_wait * 1000,
+                "max_batch": self.max_batch,
+                "waiting": sum(len(items) for items in self._groups.values()),
+                **self._counts,
+                "mean_batch_size": round(sum(self._batch_sizes) / len(self._batch_sizes), 2) if self._batch_sizes else None,
+                "queue_wait_seconds": summarize(self._queue_waits),
+                "latency_seconds": summarize(self._latencies),
+                "batch_seconds": summarize(self._batch_seconds)
+            }
+
+    def close(self):
+        with self._changed:
+            self._closed = True
+            self._changed.notify_all()
+        self._thread.join()
+
+    # Oldest waiting group; its batch leaves once full or when its first item's wait is up
+    def _next_batch(self):
+        with self._changed:
+            while not self._groups and not self._closed:
+                self._changed.wait()
+            if not self._groups:
+                return None
+            key = min(self._groups, key=lambda k: self._groups[k][0].enqueued)
+            items = self._groups[key]
+            deadline = items[0].enqueued + self.max_wait
+            while len(items) < self.max_batch and not self._closed:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    break
+                self._changed.wait(remaining)
+            batch = [items.popleft() for _ in range(min(self.max_batch, len(items)))]
+            if not items:
+                del self._groups[key]
+            return batch
+
+    def _run(self):
+        while True:
+            batch = self._next_batch()
+            if batch is None:
+                return
+            running = [item for item in batch if item.future.set_running_or_notify_cancel()]
+            if len(running) < len(batch):
+                with self._changed:
+                    self._counts["cancelled"] += len(batch) - len(running)
+            if running:
+                self._run_batch(running)
+
+    def _run_batch(self, batch):
+        question_type, profile = batch[0].question_type, batch[0].profile
+        options = {} if profile is None else {"profile": profile}
+        started = time.monotonic()
+        try:
+            outputs = self.qg.generate_batch(question_type, [item.context for item in batch], batch_size=len(batch), **options)
+        except Exception as e:
+            for item in batch:
+                item.future.set_exception(e)
+            failed = True
+        else:
+            for item, output in zip(batch, outputs):
+                item.future.set_result(output)
+            failed = False
+        finished = time.monotonic()
+
+        # The model stages inside generate_batch land in the metrics but in no request's trace,
+        # since this thread serves several requests at once
+        instrumentation.record("scheduler_batch", finished - started, {"chunks": len(batch)})
+        for item in batch:
+            instrumentation.record("scheduler_queue_wait", started - item.enqueued)
+        with self._changed:
+            self._counts["items"] += len(batch)
+            self._counts["batches"] += 1
+            self._counts["failed_batches"] += int(failed)
+            self._batch_sizes.append(len(batch))
+            self._batch_seconds.append(finished - started)
+            for item in batch:
+                self._queue_waits.append(started - item.enqueued)
+                self._latencies.append(finished - item.enqueued)
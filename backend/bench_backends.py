@@ -0,0 +1,76 @@
+import argparse
+import json
+import multiprocessing
+import os
+import resource
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+from bench_profiles import token_overlap
+
+DEFAULT_CORPUS = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'fixtures', 'corpus.txt')
+REFERENCE_BACKEND = "torch"
+
+
+def peak_rss_mb():
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+
+# Runs in a fresh process so load time and peak RSS are not polluted by other backends.
+def run_backend(backend, question_type, chunks, batch_size, profile):
+    start = time.perf_counter()
+    import main
+    qg = main.QuestionGenerator(backend=backend)
+    load_seconds = time.perf_counter() - start
+
+    start = time.perf_counter()
+    outputs = qg.generate_batch(question_type, chunks, batch_size=batch_size, profile=profile)
+    generate_seconds = time.perf_counter() - start
+
+    return {
+        "load_seconds": round(load_seconds, 3),
+        "generate_seconds": round(generate_seconds, 3),
+        "per_chunk_ms_mean": round(generate_seconds / len(chunks) * 1000, 1) if chunks else 0.0,
+        "peak_rss_mb": round(peak_rss_mb(), 1),
+        "outputs": outputs,
+    }
+
+
+def compare_backends(backends, question_type, chunks, batch_size, profile):
+    results, outputs = {}, {}
+    spawn = multiprocessing.get_context('spawn')
+    for backend in backends:
+        with ProcessPoolExecutor(max_workers=1, mp_context=spawn) as pool:
+            results[backend] = pool.submit(run_backend, backend, question_type, chunks, batch_size, profile).result()
+        outputs[backend] = results[backend].pop("outputs")
+
+    reference = outputs.get(REFERENCE_BACKEND)
+    if reference is not None:
+        for backend in backends:
+            pairs = list(zip(outputs[backend], reference))
+            results[backend]["exact_agreement"] = round(sum(a == b for a, b in pairs) / len(chunks), 3)
+            results[backend]["token_agreement"] = round(sum(token_overlap(a, b) for a, b in pairs) / len(chunks), 3)
+    return results
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Compare latency, memory and output agreement of inference backends")
+    parser.add_argument('--text', default=DEFAULT_CORPUS, help="Plain-text corpus to chunk")
+    parser.add_argument('--questionType', default="short_qa", help="Type of questions to generate")
+    parser.add_argument('--maxSentences', type=int, default=6, help="Sentences per chunk")
+    parser.add_argument('--batchSize', type=int, default=8, help="Chunks per model forward pass")
+    parser.add_argument('--profile', default="quality", help="Decoding profile")
+    parser.add_argument('--backends', nargs='+', default=["torch", "quantized"], help="Backends to compare")
+
+    args = parser.parse_args()
+
+    from main import split_into_chunks
+    with open(args.text, encoding='utf-8') as f:
+        chunks = split_into_chunks(f.read(), max_sentences_per_chunk=args.maxSentences)
+
+    result = {
+        "chunks": len(chunks),
+        "profile": args.profile,
+        "backends": compare_backends(args.backends, args.questionType, chunks, args.batchSize, args.profile)
+    }
+    print(json.dumps(result, indent=2))
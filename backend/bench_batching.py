@@ -0,0 +1,79 @@
+import argparse
+import json
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import main
+from batch_scheduler import BatchScheduler, summarize
+
+DEFAULT_CORPUS = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'fixtures', 'corpus.txt')
+
+
+# Concurrent clients, each generating its own request's chunks. Without a scheduler the
+# requests take turns on the model, as they do behind qg_server's generate_lock.
+def run_clients(generator, requests, concurrency, question_type, profile, lock=None):
+    def one_request(chunks):
+        start = time.perf_counter()
+        if lock is None:
+            generator.generate_batch(question_type, chunks, profile=profile)
+        else:
+            with lock:
+                generator.generate_batch(question_type, chunks, profile=profile)
+        return time.perf_counter() - start
+
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as executor:
+        latencies = list(executor.map(one_request, requests))
+    wall = time.perf_counter() - start
+    chunks = sum(len(chunks) for chunks in requests)
+    return {
+        "seconds": round(wall, 3),
+        "requests_per_second": round(len(requests) / wall, 3),
+        "chunks_per_second": round(chunks / wall, 3),
+        "latency_seconds": summarize(latencies)
+    }
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Request latency and throughput with and without cross-request batching")
+    parser.add_argument('--text', default=DEFAULT_CORPUS, help="Plain-text corpus to chunk")
+    parser.add_argument('--requests', type=int, default=32, help="Requests per run")
+    parser.add_argument('--chunksPerRequest', type=int, default=1, help="Chunks in each request")
+    parser.add_argument('--concurrency', type=int, default=8, help="Concurrent clients")
+    parser.add_argument('--windows', type=float, nargs='*', default=[2, 5, 20], help="Scheduler max-wait values (ms) to try")
+    parser.add_argument('--maxBatch', type=int, default=main.BATCH_SIZE, help="Scheduler max batch size")
+    parser.add_argument('--questionType', default="short_qa", help="Question type prefix used in the source")
+    parser.add_argument('--profile', default="fast", help="Decoding profile")
+
+    args = parser.parse_args()
+    with open(args.text, encoding='utf-8') as f:
+        chunks = main.split_into_chunks(f.read(), max_sentences_per_chunk=3)
+    requests = [
+        [chunks[(i * args.chunksPerRequest + j) % len(chunks)] for j in range(args.chunksPerRequest)]
+        for i in range(args.requests)
+    ]
+
+    # Measure the model, not the question cache
+    main.configure_question_generator(use_cache=False)
+    qg = main.get_question_generator()
+    qg.generate_batch(args.questionType, requests[0], profile=args.profile)  # Warm up
+
+    results = {"serial": run_clients(qg, requests, args.concurrency, args.questionType, args.profile, threading.Lock())}
+    for window in args.windows:
+        scheduler = BatchScheduler(qg, window, args.maxBatch)
+        result = run_clients(scheduler, requests, args.concurrency, args.questionType, args.profile)
+        stats = scheduler.stats()
+        scheduler.close()
+        result.update({key: stats[key] for key in ("batches", "mean_batch_size", "queue_wait_seconds")})
+        results[f"window_{window:g}ms"] = result
+
+    print(json.dumps({
+        "requests": args.requests,
+        "chunks_per_request": args.chunksPerRequest,
+        "concurrency": args.concurrency,
+        "max_batch": args.maxBatch,
+        "profile": args.profile,
+        "results": results
+    }, indent=2))
@@ -0,0 +1,64 @@
+import argparse
+import json
+import os
+import time
+
+from main import (BATCH_SIZE, QuestionGenerator, encode_sources, load_tokenizer, padding_waste,
+                  plan_batches, split_into_chunks)
+
+DEFAULT_CORPUS = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'fixtures', 'corpus.txt')
+
+# (padding, bucket_by_length) pairs compared by the benchmark
+STRATEGIES = {
+    "max_length": ('max_length', False),
+    "longest": ('longest', False),
+    "longest_bucketed": ('longest', True),
+}
+
+
+def padding_report(lengths, batch_size):
+    real_tokens = sum(lengths)
+    report = {}
+    for name, (padding, bucket) in STRATEGIES.items():
+        wasted = padding_waste(lengths, plan_batches(lengths, batch_size, bucket), padding)
+        report[name] = {
+            "padded_tokens": real_tokens + wasted,
+            "wasted_tokens": wasted,
+            "wasted_ratio": round(wasted / (real_tokens + wasted), 4) if lengths else 0.0
+        }
+    return report
+
+
+def time_generation(chunks, question_type, batch_size):
+    timings = {}
+    for name, (padding, bucket) in STRATEGIES.items():
+        qg = QuestionGenerator(padding=padding, bucket_by_length=bucket)
+        start = time.perf_counter()
+        qg.generate_batch(question_type, chunks, batch_size=batch_size)
+        timings[name] = round(time.perf_counter() - start, 3)
+    return timings
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Report encoder padding waste for each padding strategy")
+    parser.add_argument('--text', default=DEFAULT_CORPUS, help="Plain-text corpus to chunk")
+    parser.add_argument('--questionType', default="short_qa", help="Question type prefix used in the source")
+    parser.add_argument('--maxSentences', type=int, default=6, help="Sentences per chunk")
+    parser.add_argument('--batchSize', type=int, default=BATCH_SIZE, help="Chunks per model forward pass")
+    parser.add_argument('--generate', action='store_true', help="Also time generation with each strategy (loads the model)")
+
+    args = parser.parse_args()
+    with open(args.text, encoding='utf-8') as f:
+        chunks = split_into_chunks(f.read(), max_sentences_per_chunk=args.maxSentences)
+
+    lengths = [len(ids) for ids in encode_sources(load_tokenizer(), args.questionType, chunks)]
+    result = {
+        "chunks": len(chunks),
+        "batch_size": args.batchSize,
+        "real_tokens": sum(lengths),
+        "strategies": padding_report(lengths, args.batchSize)
+    }
+    if args.generate:
+        result["generation_seconds"] = time_generation(chunks, args.questionType, args.batchSize)
+
+    print(json.dumps(result, indent=2))
@@ -0,0 +1,79 @@
+import argparse
+import glob
+import json
+import os
+import time
+
+import PyPDF2
+
+from pdf_stream import available_cpus, choose_workers, iter_pages, iter_pages_parallel
+
+DEFAULT_UPLOADS = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'uploads')
+
+
+def count_pages(file_path):
+    with open(file_path, 'rb') as pdf_file:
+        return len(PyPDF2.PdfReader(pdf_file).pages)
+
+
+def extract_serial(file_path):
+    with open(file_path, 'rb') as pdf_file:
+        reader = PyPDF2.PdfReader(pdf_file)
+        return [text for _, text in iter_pages(reader)]
+
+
+def extract_parallel(file_path, total_pages, workers):
+    return [text for _, text in iter_pages_parallel(file_path, total_pages, workers)]
+
+
+# Best-of-`repeat` wall time for one extraction mode
+def best_time(extract, repeat):
+    best, texts = None, None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        texts = extract()
+        elapsed = time.perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+    return best, texts
+
+
+def bench_file(file_path, worker_counts, repeat):
+    total_pages = count_pages(file_path)
+    serial_time, reference = best_time(lambda: extract_serial(file_path), repeat)
+    modes = {"serial": {"seconds": round(serial_time, 3), "pages_per_second": round(total_pages / serial_time, 1)}}
+
+    auto_workers = choose_workers(total_pages)
+    for workers in sorted(set(worker_counts) | {auto_workers}):
+        if workers == 1:
+            continue
+        elapsed, texts = best_time(lambda: extract_parallel(file_path, total_pages, workers), repeat)
+        modes[f"workers_{workers}"] = {
+            "seconds": round(elapsed, 3),
+            "pages_per_second": round(total_pages / elapsed, 1),
+            "speedup": round(serial_time / elapsed, 2),
+            "matches_serial": texts == reference
+        }
+
+    return {
+        "file": os.path.basename(file_path),
+        "pages": total_pages,
+        "auto_workers": auto_workers,
+        "modes": modes
+    }
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Compare serial and process-pool PDF page extraction")
+    parser.add_argument('--files', nargs='*', default=None, help="PDFs to extract (default: every file in uploads/)")
+    parser.add_argument('--workers', type=int, nargs='*', default=[2, 4], help="Pool sizes to try")
+    parser.add_argument('--repeat', type=int, default=3, help="Runs per mode; the fastest is reported")
+    parser.add_argument('--importMain', action='store_true', help="Import main.py first, as a request to the app would")
+
+    args = parser.parse_args()
+    if args.importMain:
+        import main  # torch, transformers and every backend module, as in the app's process
+    files = args.files or sorted(glob.glob(os.path.join(DEFAULT_UPLOADS, '*')))
+    print(json.dumps({
+        "cpus": available_cpus(),
+        "results": [bench_file(file_path, args.workers, args.repeat) for file_path in files]
+    }, indent=2))
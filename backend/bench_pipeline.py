@@ -0,0 +1,233 @@
+import argparse
+import glob
+import json
+import multiprocessing
+import os
+import platform
+import resource
+import shutil
+import sys
+import tempfile
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+from batch_scheduler import summarize
+
+BACKEND_DIR = os.path.dirname(os.path.abspath(__file__))
+DEFAULT_FIXTURES = os.path.join(BACKEND_DIR, 'fixtures', 'html', 'index.json')
+DEFAULT_UPLOADS = os.path.join(BACKEND_DIR, 'uploads')
+RESULT_VERSION = 1
+
+
+def peak_rss_mb():
+    return round(resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024, 1)
+
+
+# Every child gets its own empty cache directory, with the fixture pages seeded into it, and
+# may only use the cached model, the seeded pages and the mock distractor endpoint
+def prepare_offline(cache_dir, fixtures_path):
+    os.environ['QUIZZLLM_CACHE_DIR'] = cache_dir
+    os.environ['QUIZZLLM_OFFLINE'] = '1'
+    os.environ['HF_HUB_OFFLINE'] = '1'
+    os.environ['TRANSFORMERS_OFFLINE'] = '1'
+
+    import catalog
+    import content_cache
+    base = os.path.dirname(os.path.abspath(fixtures_path))
+    with open(fixtures_path, encoding='utf-8') as f:
+        fixtures = json.load(f)
+    for url, html_file in fixtures.items():
+        with open(os.path.join(base, html_file), encoding='utf-8') as f:
+            content_cache.seed_from_html(url, f.read())
+
+    # Catalog entries whose page is one of the fixtures, in catalog order
+    return [(entry["topic"], entry["subTopic"]) for entry in catalog.entries() if entry["url"] in fixtures]
+
+
+# One request; returns its wall time, the gap before each question it produced and the count
+def timed_request(generate):
+    arrivals = []
+
+    def progress(completed, total, record):
+        if record is not None:
+            arrivals.append(time.perf_counter())
+
+    start = time.perf_counter()
+    result = generate(progress)
+    elapsed = time.perf_counter() - start
+    gaps = [later - earlier for earlier, later in zip([start] + arrivals, arrivals)]
+    return elapsed, gaps, len(result.get("questions", []))
+
+
+# Runs in a fresh process per question type: cold start (imports + model load), then every
+# fixture topic and upload `repeat` times. The first pass over an upload extracts the PDF;
+# later passes are served by the upload cache, as in production. Dedup history is off, so
+# later passes do not skip the questions of earlier ones and stay comparable.
+def run_question_type(question_type, cache_dir, fixtures_path, files, num_questions, repeat, profile, distractor_source):
+    process_start = time.perf_counter()
+    topics = prepare_offline(cache_dir, fixtures_path)
+    import main
+    import question_dedup
+    import_seconds = time.perf_counter() - process_start
+
+    main.configure_question_generator(use_cache=False)  # Measure the model, not the question cache
+    question_dedup.set_history_enabled(False)  # Every pass then generates from the same chunks
+    start = time.perf_counter()
+    main.get_question_generator()
+    load_seconds = time.perf_counter() - start
+
+    requests = [
+        (f"topic:{topic}/{subtopic}", lambda progress, topic=topic, subtopic=subtopic: main.generate_questions(
+            topic, subtopic, question_type, num_questions, profile=profile, distractor_source=distractor_source,
+            progress=progress))
+        for topic, subtopic in topics
+    ] + [
+        (f"file:{os.path.basename(path)}", lambda progress, path=path: main.generate_questions_from_file(
+            path, question_type, num_questions, profile=profile, distractor_source=distractor_source, progress=progress))
+        for path in files
+    ]
+
+    request_seconds, question_seconds, first_request, questions = [], [], None, 0
+    run_start = time.perf_counter()
+    for _ in range(repeat):
+        for _, generate in requests:
+            elapsed, gaps, count = timed_request(generate)
+            first_request = elapsed if first_request is None else first_request
+            request_seconds.append(elapsed)
+            question_seconds.extend(gaps)
+            questions += count
+    run_seconds = time.perf_counter() - run_start
+
+    return {
+        "cold_start_seconds": round(import_seconds + load_seconds, 3),
+        "import_seconds": round(import_seconds, 3),
+        "model_load_seconds": round(load_seconds, 3),
+        "first_request_seconds": round(first_request or 0.0, 3),
+        "requests": [name for name, _ in requests],
+        "request_seconds": summarize(request_seconds),
+        "question_seconds": summarize(question_seconds),
+        "questions": questions,
+        "questions_per_second": round(questions / run_seconds, 3) if run_seconds else None,
+        "peak_rss_mb": peak_rss_mb()
+    }
+
+
+# The question-count endpoints (getnumques.py for topics, getmaxques.py for uploads), each
+# timed on an empty cache and again on the warm one
+def run_question_counts(cache_dir, fixtures_path, files):
+    topics = prepare_offline(cache_dir, fixtures_path)
+    import getmaxques
+    import getnumques
+
+    def twice(call):
+        times = []
+        for _ in range(2):
+            start = time.perf_counter()
+            result = call()
+            times.append(time.perf_counter() - start)
+        return {"cold_seconds": round(times[0], 4), "warm_seconds": round(times[1], 4),
+                "max_questions": result.get("max_questions")}
+
+    return {
+        "getnumques": {f"{topic}/{subtopic}": twice(lambda: getnumques.get_max_questions(topic, subtopic))
+                       for topic, subtopic in topics},
+        "getmaxques": {os.path.basename(path): twice(lambda: getmaxques.generate_questions_from_file(path))
+                       for path in files},
+        "peak_rss_mb": peak_rss_mb()
+    }
+
+
+def run_isolated(fn, *args):
+    spawn = multiprocessing.get_context('spawn')
+    with ProcessPoolExecutor(max_workers=1, mp_context=spawn) as pool:
+        try:
+            return pool.submit(fn, *args).result()
+        except Exception as e:
+            return {"error": f"{type(e).__name__}: {e}"}
+
+
+# Numeric leaves of two result files side by side, keyed by their dotted path
+def flatten(value, prefix=""):
+    if isinstance(value, dict):
+        flat = {}
+        for key, item in value.items():
+            flat.update(flatten(item, f"{prefix}.{key}" if prefix else key))
+        return flat
+    if isinstance(value, (int, float)) and not isinstance(value, bool):
+        return {prefix: value}
+    return {}
+
+
+def diff_results(baseline, current):
+    before, after = flatten(baseline.get("results", {})), flatten(current.get("results", {}))
+    changes = {}
+    for key in sorted(before.keys() & after.keys()):
+        if before[key] != after[key]:
+            change = round((after[key] - before[key]) / before[key] * 100, 1) if before[key] else None
+            changes[key] = {"baseline": before[key], "current": after[key], "change_pct": change}
+    return changes
+
+
+if __name__ == "__main__":
+    from main import DISTRACTOR_SOURCES, QUESTION_TYPES  # Here only: each child imports main after prepare_offline
+
+    parser = argparse.ArgumentParser(description="Offline benchmark of the whole question generation pipeline")
+    parser.add_argument('--questionTypes', nargs='*', default=list(QUESTION_TYPES), help="Question types to run")
+    parser.add_argument('--numQuestions', type=int, default=5, help="Questions per request")
+    parser.add_argument('--repeat', type=int, default=2, help="Passes over every topic and upload")
+    parser.add_argument('--profile', default="quality", help="Decoding profile")
+    parser.add_argument('--distractors', choices=DISTRACTOR_SOURCES, default="xai", help="MCQ distractor source")
+    parser.add_argument('--distractorLatency', type=float, default=0.2, help="Seconds the mock x.ai endpoint waits per call")
+    parser.add_argument('--fixtures', default=DEFAULT_FIXTURES, help="JSON mapping catalog URL -> local HTML file")
+    parser.add_argument('--files', nargs='*', default=None, help="PDFs to generate from (default: every file in uploads/)")
+    parser.add_argument('--output', default=None, help="Write the results here instead of stdout")
+    parser.add_argument('--baseline', default=None, help="Earlier results file to report changes against")
+
+    args = parser.parse_args()
+    files = args.files if args.files is not None else sorted(glob.glob(os.path.join(DEFAULT_UPLOADS, '*')))
+
+    import mock_xai_server
+    mock = mock_xai_server.start_mock_server(latency=args.distractorLatency)
+    os.environ['XAI_API_URL'] = mock.url  # Inherited by the spawned children
+    os.environ['XAI_API_KEY'] = 'mock'
+
+    scratch = tempfile.mkdtemp(prefix='quizzllm-bench-')
+    try:
+        results = {
+            question_type: run_isolated(run_question_type, question_type, os.path.join(scratch, question_type),
+                                        args.fixtures, files, args.numQuestions, args.repeat, args.profile, args.distractors)
+            for question_type in args.questionTypes
+        }
+        results["question_counts"] = run_isolated(run_question_counts, os.path.join(scratch, "counts"), args.fixtures, files)
+    finally:
+        shutil.rmtree(scratch, ignore_errors=True)
+        mock.shutdown()
+
+    report = {
+        "version": RESULT_VERSION,
+        "environment": {
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "cpus": os.cpu_count()
+        },
+        "settings": {
+            "num_questions": args.numQuestions,
+            "repeat": args.repeat,
+            "profile": args.profile,
+            "distractors": args.distractors,
+            "distractor_latency": args.distractorLatency,
+            "files": [os.path.basename(path) for path in files]
+        },
+        "results": results
+    }
+    if args.baseline:
+        with open(args.baseline, encoding='utf-8') as f:
+            report["changes"] = diff_results(json.load(f), report)
+
+    text = json.dumps(report, indent=2, sort_keys=True)
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as f:
+            f.write(text + "\n")
+    else:
+        print(text)
+    sys.exit(1 if any("error" in result for result in results.values()) else 0)
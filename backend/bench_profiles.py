@@ -0,0 +1,85 @@
+import argparse
+import json
+import os
+import time
+
+from main import BATCH_SIZE, DECODING_PROFILES, SEP_TOKEN, QuestionGenerator, split_into_chunks
+
+DEFAULT_CORPUS = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'fixtures', 'corpus.txt')
+REFERENCE_PROFILE = "quality"
+
+
+def parse_output(raw_question):
+    parts = raw_question.split(SEP_TOKEN)
+    if len(parts) != 3 or not parts[2].strip():
+        return None
+    return parts[1].strip(), parts[2].strip()
+
+
+def token_overlap(a, b):
+    a, b = set(a.lower().split()), set(b.lower().split())
+    return len(a & b) / len(a | b) if a | b else 1.0
+
+
+def percentile(values, pct):
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(round(pct / 100 * (len(ordered) - 1))))]
+
+
+# Latency and cheap quality proxies for each profile over the same chunks:
+#   valid_rate            share of outputs that parse into question <sep> answer
+#   answer_in_context     share of valid answers that appear verbatim in their chunk
+#   agreement             mean token overlap with the reference (16-beam) output
+def profile_report(qg, question_type, chunks, batch_size, profiles):
+    outputs, report = {}, {}
+    for profile in profiles:
+        latencies = []
+        raw = []
+        total = 0.0
+        for start in range(0, len(chunks), batch_size):
+            batch = chunks[start:start + batch_size]
+            t0 = time.perf_counter()
+            raw.extend(qg.generate_batch(question_type, batch, batch_size=batch_size, profile=profile))
+            elapsed = time.perf_counter() - t0
+            total += elapsed
+            latencies.append(elapsed / len(batch))
+        outputs[profile] = raw
+
+        parsed = [parse_output(r) for r in raw]
+        valid = [(p, chunk) for p, chunk in zip(parsed, chunks) if p]
+        report[profile] = {
+            "settings": DECODING_PROFILES[profile],
+            "total_seconds": round(total, 3),
+            "per_chunk_ms_p50": round(percentile(latencies, 50) * 1000, 1),
+            "per_chunk_ms_p95": round(percentile(latencies, 95) * 1000, 1),
+            "valid_rate": round(len(valid) / len(chunks), 3),
+            "answer_in_context": round(sum(a.lower() in c.lower() for (q, a), c in valid) / len(valid), 3) if valid else 0.0,
+        }
+
+    if REFERENCE_PROFILE in outputs:
+        for profile in profiles:
+            pairs = zip(outputs[profile], outputs[REFERENCE_PROFILE])
+            report[profile]["agreement"] = round(sum(token_overlap(a, b) for a, b in pairs) / len(chunks), 3)
+    return report
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Compare decoding profiles on a fixed local corpus")
+    parser.add_argument('--text', default=DEFAULT_CORPUS, help="Plain-text corpus to chunk")
+    parser.add_argument('--questionType', default="short_qa", help="Type of questions to generate")
+    parser.add_argument('--maxSentences', type=int, default=6, help="Sentences per chunk")
+    parser.add_argument('--batchSize', type=int, default=BATCH_SIZE, help="Chunks per model forward pass")
+    parser.add_argument('--profiles', nargs='+', choices=list(DECODING_PROFILES), default=list(DECODING_PROFILES),
+                        help="Profiles to compare")
+
+    args = parser.parse_args()
+    with open(args.text, encoding='utf-8') as f:
+        chunks = split_into_chunks(f.read(), max_sentences_per_chunk=args.maxSentences)
+
+    qg = QuestionGenerator()
+    result = {
+        "chunks": len(chunks),
+        "question_type": args.questionType,
+        "profiles": profile_report(qg, args.questionType, chunks, args.batchSize, args.profiles)
+    }
+    print(json.dumps(result, indent=2))
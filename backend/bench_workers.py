@@ -0,0 +1,101 @@
+import argparse
+import json
+import os
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import main
+from bench_profiles import percentile
+from qg_workers import available_cores
+
+DEFAULT_CORPUS = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'fixtures', 'corpus.txt')
+
+
+# Runs inside a worker: one request's worth of chunks through the worker's model copy
+def generate_chunks(question_type, chunks, profile):
+    return main.get_question_generator().generate_batch(question_type, chunks, profile=profile)
+
+
+# Proportional set size of a process: shared pages are split between the processes using
+# them, so copy-on-write weights show up as a fraction of the model per worker
+def pss_mb(pid):
+    try:
+        with open(f'/proc/{pid}/smaps_rollup') as f:
+            for line in f:
+                if line.startswith('Pss:'):
+                    return round(int(line.split()[1]) / 1024, 1)
+    except OSError:
+        pass
+    return None
+
+
+def run_workers(workers, threads, pin_cores, requests, concurrency, question_type, profile):
+    pool = main.start_worker_pool(workers, threads, pin_cores, {"generate_chunks": generate_chunks}) if workers > 1 else None
+    if pool is None:
+        main.set_torch_threads(threads or len(available_cores()))
+
+    def one_request(chunks):
+        start = time.perf_counter()
+        if pool is None:
+            generate_chunks(question_type, chunks, profile)
+        else:
+            pool.submit("generate_chunks", question_type, chunks, profile).result()
+        return time.perf_counter() - start
+
+    # Warm every worker before timing
+    with ThreadPoolExecutor(max_workers=max(workers, 1)) as executor:
+        list(executor.map(one_request, requests[:workers]))
+
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as executor:
+        latencies = list(executor.map(one_request, requests))
+    wall = time.perf_counter() - start
+
+    stats = pool.stats() if pool is not None else {"pids": [os.getpid()], "threads_per_worker": threads}
+    result = {
+        "workers": workers,
+        "threads_per_worker": stats["threads_per_worker"],
+        "requests": len(requests),
+        "chunks": sum(len(chunks) for chunks in requests),
+        "seconds": round(wall, 3),
+        "requests_per_second": round(len(requests) / wall, 3),
+        "chunks_per_second": round(sum(len(chunks) for chunks in requests) / wall, 3),
+        "latency_p50": round(percentile(latencies, 50), 3),
+        "latency_p95": round(percentile(latencies, 95), 3),
+        "worker_pss_mb": [pss_mb(pid) for pid in stats["pids"]],
+        "parent_pss_mb": pss_mb(os.getpid())
+    }
+    if pool is not None:
+        pool.close()
+    return result
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Throughput of the model worker pool for different worker counts")
+    parser.add_argument('--text', default=DEFAULT_CORPUS, help="Plain-text corpus to chunk")
+    parser.add_argument('--workers', type=int, nargs='*', default=[1, 2, 4], help="Worker counts to compare")
+    parser.add_argument('--threads', type=int, default=None, help="Threads per worker (default: cores / workers)")
+    parser.add_argument('--pinCores', action='store_true', help="Pin each worker to its own block of cores")
+    parser.add_argument('--requests', type=int, default=16, help="Requests per run")
+    parser.add_argument('--chunksPerRequest', type=int, default=2, help="Chunks in each request")
+    parser.add_argument('--concurrency', type=int, default=None, help="Concurrent clients (default: 2 x workers)")
+    parser.add_argument('--questionType', default="short_qa", help="Question type prefix used in the source")
+    parser.add_argument('--profile', default="fast", help="Decoding profile")
+
+    args = parser.parse_args()
+    with open(args.text, encoding='utf-8') as f:
+        chunks = main.split_into_chunks(f.read(), max_sentences_per_chunk=3)
+    requests = [
+        [chunks[(i * args.chunksPerRequest + j) % len(chunks)] for j in range(args.chunksPerRequest)]
+        for i in range(args.requests)
+    ]
+
+    # Measure the model, not the question cache
+    main.configure_question_generator(use_cache=False)
+    results = []
+    for workers in args.workers:
+        threads = args.threads or max(1, len(available_cores()) // workers)
+        results.append(run_workers(workers, threads, args.pinCores, requests, args.concurrency or 2 * workers,
+                                   args.questionType, args.profile))
+
+    print(json.dumps({"cores": len(available_cores()), "profile": args.profile, "results": results}, indent=2))
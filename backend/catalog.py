@@ -0,0 +1,101 @@
+import argparse
+import json
+import os
+
+from chunk_index import CHUNK_SENTENCES
+from paths import BACKEND_DIR, CACHE_ROOT, temp_path
+
+CATALOG_PATH = os.environ.get('QUIZZLLM_CATALOG', os.path.join(BACKEND_DIR, 'catalog.json'))
+METADATA_PATH = os.path.join(CACHE_ROOT, 'catalog_metadata.json')
+CATALOG_VERSION = 1
+
+_catalog = None
+_catalog_path = None
+_metadata = None
+_metadata_path = None
+
+
+# Every topic page the app offers, read from catalog.json once per process:
+#   {"version", "defaults": {...}, "topics": {topic: {sub-topic: {"url", ...}}}}
+# Entry keys override the defaults, e.g. "chunk_sentences" for a page whose paragraphs are
+# unusually short or long.
+def load(path=CATALOG_PATH):
+    global _catalog, _catalog_path
+    if _catalog is None or _catalog_path != path:
+        with open(path, encoding='utf-8') as f:
+            data = json.load(f)
+        if data.get("version") != CATALOG_VERSION:
+            raise ValueError(f"Unsupported catalog version in {path}: {data.get('version')}")
+        defaults = {"chunk_sentences": CHUNK_SENTENCES, **data.get("defaults", {})}
+        _catalog = {
+            (topic, subtopic): {**defaults, **entry, "topic": topic, "subTopic": subtopic}
+            for topic, subtopics in data["topics"].items()
+            for subtopic, entry in subtopics.items()
+        }
+        _catalog_path = path
+    return _catalog
+
+
+# Entries in catalog order
+def entries(path=CATALOG_PATH) -> list:
+    return list(load(path).values())
+
+
+# The entry for a topic page, or None when the catalog has no such sub-topic
+def get_entry(topic, subtopic, path=CATALOG_PATH):
+    return load(path).get((topic, subtopic))
+
+
+# Metadata about the cached content of each page (sentence count, title, when it was
+# indexed), written by chunk_index.py when it builds the index, so question counts need
+# neither the index itself nor the page
+def read_metadata(path=METADATA_PATH) -> dict:
+    global _metadata, _metadata_path
+    if _metadata is None or _metadata_path != path:
+        try:
+            with open(path, encoding='utf-8') as f:
+                data = json.load(f)
+        except (OSError, ValueError):
+            data = {}
+        _metadata = data.get("pages", {}) if data.get("version") == CATALOG_VERSION else {}
+        _metadata_path = path
+    return _metadata
+
+
+def get_metadata(url, path=METADATA_PATH):
+    return read_metadata(path).get(url)
+
+
+def write_metadata(pages, path=METADATA_PATH):
+    global _metadata, _metadata_path
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    tmp_path = temp_path(path)
+    try:
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump({"version": CATALOG_VERSION, "pages": pages}, f, indent=1)
+        os.replace(tmp_path, path)
+    finally:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+    _metadata, _metadata_path = None, None
+
+
+# Chunks the entry's page splits into, from its metadata; None when it is not indexed
+def chunk_count(entry, path=METADATA_PATH):
+    metadata = get_metadata(entry["url"], path)
+    if metadata is None:
+        return None
+    return -(-metadata["sentences"] // entry["chunk_sentences"])
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="List the topic catalog with its cached content metadata")
+    parser.add_argument('--catalog', default=CATALOG_PATH, help="Catalog file")
+    parser.add_argument('--topic', default=None, help="Only this topic")
+
+    args = parser.parse_args()
+    print(json.dumps([
+        {**entry, "chunks": chunk_count(entry), "metadata": get_metadata(entry["url"])}
+        for entry in entries(args.catalog)
+        if args.topic in (None, entry["topic"])
+    ], indent=2))
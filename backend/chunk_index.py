@@ -0,0 +1,110 @@
+import argparse
+import gzip
+import json
+import os
+import time
+
+from paths import CACHE_ROOT, temp_path
+
+INDEX_PATH = os.path.join(CACHE_ROOT, 'chunk_index.json.gz')
+CHUNK_SENTENCES = 6  # Sentences per chunk, shared by /getnumques and generation
+INDEX_VERSION = 1
+
+_index = None
+_index_path = None
+
+
+# Sentence-split every catalog page (catalog.entries()) once. Each entry keeps the sentences;
+# chunks are rebuilt from them by joining, so request time needs neither NLTK nor the network.
+# Building the default index also refreshes the catalog's content metadata.
+def build_index(catalog_entries, path=INDEX_PATH):
+    from nltk.tokenize import sent_tokenize
+    from content_cache import get_geeksforgeeks_content
+    import catalog
+
+    entries, failures = {}, {}
+    for entry in catalog_entries:
+        url = entry["url"]
+        context = get_geeksforgeeks_content(url)
+        if "Failed to retrieve content" in context or "Error occurred" in context:
+            failures[url] = context
+            continue
+        entries[url] = {"topic": entry["topic"], "subTopic": entry["subTopic"], "sentences": sent_tokenize(context)}
+
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    tmp_path = temp_path(path)
+    try:
+        with gzip.open(tmp_path, 'wt', encoding='utf-8') as f:
+            json.dump({"version": INDEX_VERSION, "built_at": time.time(), "entries": entries}, f, separators=(',', ':'))
+        os.replace(tmp_path, path)
+    finally:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+    reset()
+
+    if path == INDEX_PATH:
+        now = time.time()
+        catalog.write_metadata({
+            url: {"sentences": len(e["sentences"]), "characters": sum(len(sentence) for sentence in e["sentences"]),
+                  "indexed_at": now}
+            for url, e in entries.items()
+        })
+    return entries, failures
+
+
+def load_index(path=INDEX_PATH):
+    global _index, _index_path
+    if _index is None or _index_path != path:
+        try:
+            with gzip.open(path, 'rt', encoding='utf-8') as f:
+                index = json.load(f)
+        except (OSError, ValueError):
+            index = {}
+        _index = index.get("entries", {}) if index.get("version") == INDEX_VERSION else {}
+        _index_path = path
+    return _index
+
+
+def reset():
+    global _index, _index_path
+    _index = None
+    _index_path = None
+
+
+def get_sentences(url, path=INDEX_PATH):
+    entry = load_index(path).get(url)
+    return entry["sentences"] if entry else None
+
+
+# Chunks for a catalog URL, or None when the page is not in the index
+def get_chunks(url, max_sentences_per_chunk=CHUNK_SENTENCES, path=INDEX_PATH):
+    sentences = get_sentences(url, path)
+    if sentences is None:
+        return None
+    return [" ".join(sentences[i:i + max_sentences_per_chunk]) for i in range(0, len(sentences), max_sentences_per_chunk)]
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Build or inspect the sentence/chunk index for the topic catalog")
+    parser.add_argument('--build', action='store_true', help="Scrape (or read from the content cache) and index every catalog page")
+    parser.add_argument('--output', default=INDEX_PATH, help="Index file to write or inspect")
+    parser.add_argument('--offline', action='store_true', help="Build from the content cache only")
+
+    args = parser.parse_args()
+
+    import catalog
+    if args.build:
+        import content_cache
+        if args.offline:
+            content_cache.set_offline(True)
+        entries, failures = build_index(catalog.entries(), args.output)
+    else:
+        entries, failures = load_index(args.output), {}
+
+    chunk_sentences = {entry["url"]: entry["chunk_sentences"] for entry in catalog.entries()}
+    print(json.dumps({
+        "indexed": len(entries),
+        "chunks": sum(-(-len(e["sentences"]) // chunk_sentences.get(url, CHUNK_SENTENCES)) for url, e in entries.items()),
+        "missing": [url for url in chunk_sentences if url not in entries],
+        "failed": failures
+    }, indent=2))
@@ -0,0 +1,115 @@
+import argparse
+import json
+import math
+import re
+
+import numpy as np
+
+from text_features import STOPWORDS, WORD_RE, feature_hash
+
+HASH_DIM = 1 << 12  # Hashed vocabulary for the chunk vectors
+MIN_WORDS = 12  # Shorter chunks (headings, captions, stray lines) rarely make a question
+FULL_WORDS = 40  # Chunks this long get the full length factor
+DUPLICATE_SIMILARITY = 0.8  # Chunks this close to a better one are only used as a last resort
+KEYWORD_WEIGHT = 0.5  # Share of the score from covering the document's recurring terms vs. density
+OVERPROVISION = 0.25  # Extra chunks in the first wave, for outputs that do not parse
+MIN_YIELD = 0.25  # Floor on the observed valid-question rate when sizing later waves
+CANDIDATES_PER_QUESTION = 3  # Chunks to read from an upload per requested question
+
+_SYMBOL_RE = re.compile(r"[^\w\s.,;:'\"()\-]")
+
+
+def _content_words(words):
+    return [word for word in words if len(word) > 2 and word not in STOPWORDS]
+
+
+# Per-chunk word counts over the hashed vocabulary
+def term_matrix(chunks):
+    counts = np.zeros((len(chunks), HASH_DIM), dtype=np.float32)
+    lengths = np.zeros(len(chunks), dtype=np.float32)
+    for row, chunk in enumerate(chunks):
+        words = [word.lower() for word in WORD_RE.findall(chunk)]
+        lengths[row] = len(words)
+        for word in _content_words(words):
+            counts[row, feature_hash(word, HASH_DIM)] += 1
+    return counts, lengths
+
+
+# Quality of each chunk as question material, in [0, 1]:
+#   density    distinct content words per word; boilerplate and filler score low
+#   keywords   how much of the document's recurring vocabulary the chunk covers
+# scaled down for short fragments and for code or symbol-heavy text
+def score_chunks(chunks, counts=None, lengths=None):
+    if not chunks:
+        return np.zeros(0, dtype=np.float32)
+    if counts is None:
+        counts, lengths = term_matrix(chunks)
+    present = counts > 0
+    density = present.sum(axis=1) / np.maximum(lengths, 1)
+
+    # Terms found in several chunks are the document's subject matter
+    df = present.sum(axis=0)
+    weights = np.where(df >= 2, np.log1p(counts.sum(axis=0)), 0.0).astype(np.float32)
+    keywords = present @ weights
+    keywords = keywords / keywords.max() if keywords.max() > 0 else keywords
+
+    length_factor = np.clip((lengths - MIN_WORDS) / (FULL_WORDS - MIN_WORDS), 0, 1)
+    symbols = np.array([len(_SYMBOL_RE.findall(chunk)) / max(len(chunk), 1) for chunk in chunks], dtype=np.float32)
+    prose = np.clip(1 - 4 * symbols, 0, 1)
+
+    density = density / density.max() if density.max() > 0 else density
+    return ((KEYWORD_WEIGHT * keywords + (1 - KEYWORD_WEIGHT) * density) * length_factor * prose).astype(np.float32)
+
+
+# L2-normalized TF-IDF rows, for cosine similarity as one matrix-vector product per pick
+def chunk_vectors(counts):
+    idf = np.log((1 + len(counts)) / (1 + (counts > 0).sum(axis=0))) + 1
+    vectors = counts * idf
+    norms = np.linalg.norm(vectors, axis=1, keepdims=True)
+    return vectors / np.where(norms == 0, 1, norms)
+
+
+# Chunk indices, best first. Near-duplicates of a better chunk and chunks scoring zero go to
+# the back, so they are only used when a request needs more questions than the rest can give.
+def rank_chunks(chunks):
+    if not chunks:
+        return []
+    counts, lengths = term_matrix(chunks)
+    scores = score_chunks(chunks, counts, lengths)
+    vectors = chunk_vectors(counts)
+
+    closest = np.zeros(len(chunks), dtype=np.float32)  # Similarity to the nearest chunk picked so far
+    picked, held_back = [], []
+    for i in np.argsort(-scores, kind='stable'):
+        if scores[i] <= 0 or closest[i] > DUPLICATE_SIMILARITY:
+            held_back.append(int(i))
+            continue
+        picked.append(int(i))
+        closest = np.maximum(closest, vectors @ vectors[i])
+    return picked + held_back
+
+
+# Chunks to run in the next wave when `missing` questions are still needed. The first wave
+# adds a fixed margin; later ones are sized by the valid-question rate seen so far.
+def wave_size(missing, attempted=0, valid=0):
+    if attempted == 0:
+        return missing + max(1, math.ceil(missing * OVERPROVISION))
+    return math.ceil(missing / max(valid / attempted, MIN_YIELD))
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Rank the chunks of a plain-text document as question material")
+    parser.add_argument('--text', required=True, help="Plain-text document")
+    parser.add_argument('--maxSentences', type=int, default=6, help="Sentences per chunk")
+    parser.add_argument('--top', type=int, default=10, help="Chunks to show")
+
+    args = parser.parse_args()
+    from nltk.tokenize import sent_tokenize
+    with open(args.text, encoding='utf-8') as f:
+        sentences = sent_tokenize(f.read())
+    chunks = [" ".join(sentences[i:i + args.maxSentences]) for i in range(0, len(sentences), args.maxSentences)]
+    scores = score_chunks(chunks)
+    print(json.dumps([
+        {"chunk": i, "score": round(float(scores[i]), 3), "text": chunks[i][:120]}
+        for i in rank_chunks(chunks)[:args.top]
+    ], indent=2))
@@ -0,0 +1,175 @@
+import argparse
+import hashlib
+import json
+import os
+import time
+
+import requests
+from bs4 import BeautifulSoup
+
+from paths import CACHE_ROOT, temp_path
+
+CACHE_DIR = os.path.join(CACHE_ROOT, 'content')
+DEFAULT_TTL = 24 * 60 * 60  # Seconds before a cached page is revalidated
+MAX_CACHE_BYTES = 64 * 1024 * 1024  # Least recently used entries are evicted above this
+REQUEST_TIMEOUT = 15
+HEADERS = {'User-Agent': 'Mozilla/5.0'}
+
+# Offline mode serves only what is already cached; QUIZZLLM_OFFLINE=1 enables it for every script.
+_offline = os.environ.get('QUIZZLLM_OFFLINE', '') not in ('', '0')
+
+
+def set_offline(offline):
+    global _offline
+    _offline = offline
+
+
+def is_offline():
+    return _offline
+
+
+# Title and paragraph text of an article page
+def extract_content(html):
+    soup = BeautifulSoup(html, 'html.parser')
+    heading = soup.find('h1')
+    if heading is None:
+        raise ValueError("No <h1> title found")
+    title = heading.get_text(strip=True)
+    content_section = soup.find('div', {'class': 'entry-content'}) or soup.find('article')
+    paragraphs = content_section.find_all('p') if content_section else []
+    content = ' '.join([para.get_text(strip=True) for para in paragraphs])
+    return title, content
+
+
+def format_content(title, content):
+    return f"Title: {title}\n\nContent:\n{content}"
+
+
+def _entry_path(url, cache_dir):
+    return os.path.join(cache_dir, hashlib.sha256(url.encode('utf-8')).hexdigest() + '.json')
+
+
+def read_entry(url, cache_dir=CACHE_DIR):
+    path = _entry_path(url, cache_dir)
+    try:
+        with open(path, encoding='utf-8') as f:
+            entry = json.load(f)
+        os.utime(path)  # mtime doubles as the last-access time for eviction
+    except (OSError, ValueError):
+        return None  # Missing, unreadable, or evicted by another process meanwhile
+    return entry
+
+
+def write_entry(entry, cache_dir=CACHE_DIR, max_bytes=MAX_CACHE_BYTES):
+    os.makedirs(cache_dir, exist_ok=True)
+    path = _entry_path(entry['url'], cache_dir)
+    tmp_path = temp_path(path)
+    try:
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump(entry, f)
+        os.replace(tmp_path, path)
+    finally:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+    evict(cache_dir, max_bytes)
+
+
+# Drop least recently used entries until the directory fits in max_bytes
+def evict(cache_dir=CACHE_DIR, max_bytes=MAX_CACHE_BYTES):
+    entries = []
+    for name in os.listdir(cache_dir):
+        if name.endswith('.json'):
+            try:
+                stat = os.stat(os.path.join(cache_dir, name))
+            except FileNotFoundError:
+                continue  # Evicted by another process
+            entries.append((stat.st_mtime, stat.st_size, name))
+    total = sum(size for _, size, _ in entries)
+    for _, size, name in sorted(entries):
+        if total <= max_bytes:
+            break
+        try:
+            os.remove(os.path.join(cache_dir, name))
+        except FileNotFoundError:
+            pass
+        total -= size
+
+
+def make_entry(url, title, content, etag=None, last_modified=None):
+    return {
+        "url": url,
+        "title": title,
+        "content": content,
+        "etag": etag,
+        "last_modified": last_modified,
+        "fetched_at": time.time()
+    }
+
+
+# Store a page from local HTML, e.g. a test fixture, as if it had just been fetched
+def seed_from_html(url, html, cache_dir=CACHE_DIR):
+    title, content = extract_content(html)
+    write_entry(make_entry(url, title, content), cache_dir)
+
+
+def fetch_content(url, ttl=DEFAULT_TTL, cache_dir=CACHE_DIR):
+    entry = read_entry(url, cache_dir)
+    if entry and (is_offline() or time.time() - entry['fetched_at'] < ttl):
+        return entry
+    if is_offline():
+        raise LookupError(f"{url} is not cached and offline mode is enabled")
+
+    headers = dict(HEADERS)
+    if entry and entry.get('etag'):
+        headers['If-None-Match'] = entry['etag']
+    if entry and entry.get('last_modified'):
+        headers['If-Modified-Since'] = entry['last_modified']
+
+    try:
+        response = requests.get(url, headers=headers, timeout=REQUEST_TIMEOUT)
+    except requests.RequestException:
+        if entry:
+            return entry  # Stale copy beats no copy
+        raise
+    if response.status_code == 304 and entry:
+        entry['fetched_at'] = time.time()
+        write_entry(entry, cache_dir)
+        return entry
+    if response.status_code != 200:
+        if entry:
+            return entry
+        raise requests.HTTPError(f"HTTP Status Code: {response.status_code}", response=response)
+
+    title, content = extract_content(response.text)
+    entry = make_entry(url, title, content, response.headers.get('ETag'), response.headers.get('Last-Modified'))
+    write_entry(entry, cache_dir)
+    return entry
+
+
+# Cached replacement for the scripts' original scraper; keeps its return-string contract.
+def get_geeksforgeeks_content(url):
+    try:
+        entry = fetch_content(url)
+        return format_content(entry['title'], entry['content'])
+    except requests.HTTPError as e:
+        return f"Failed to retrieve content. {e}"
+    except Exception as e:
+        return f"Error occurred: {e}"
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Manage the scraped topic page cache")
+    parser.add_argument('--seed', help="JSON file mapping URL -> local HTML file (paths relative to the JSON file)")
+    parser.add_argument('--fetch', nargs='*', default=[], help="URLs to fetch into the cache")
+
+    args = parser.parse_args()
+    if args.seed:
+        base = os.path.dirname(os.path.abspath(args.seed))
+        with open(args.seed, encoding='utf-8') as f:
+            fixtures = json.load(f)
+        for url, html_file in fixtures.items():
+            with open(os.path.join(base, html_file), encoding='utf-8') as f:
+                seed_from_html(url, f.read())
+        print(f"Seeded {len(fixtures)} pages into {CACHE_DIR}")
+    for url in args.fetch:
+        print(get_geeksforgeeks_content(url)[:80])
@@ -0,0 +1,285 @@
+import json
+import os
+import re
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+
+import requests
+from requests.adapters import HTTPAdapter
+
+import instrumentation
+
+XAI_API_URL = os.environ.get('XAI_API_URL', "https://api.x.ai/v1/chat/completions")
+XAI_API_KEY = os.environ.get('XAI_API_KEY', '')  # Unset disables the x.ai source; MCQs use local distractors
+XAI_MODEL = "grok-beta"
+
+MAX_CONCURRENCY = int(os.environ.get('XAI_MAX_CONCURRENCY', 4))  # In-flight API calls per process
+RATE_PER_SECOND = float(os.environ.get('XAI_RATE_PER_SECOND', 4))  # Sustained request rate
+BURST = int(os.environ.get('XAI_BURST', 4))
+REQUEST_TIMEOUT = (5, 30)  # Connect, read seconds
+MAX_RETRIES = 3
+BATCH_SIZE = int(os.environ.get('XAI_BATCH_SIZE', 5))  # Questions per chat completion; 1 disables batching
+
+FALLBACK_DISTRACTORS = ["None of the above", "Not sure", "All of the above"]
+
+SYSTEM_PROMPT = (
+    "You are an intelligent assistant specialized in generating multiple-choice questions. "
+    "Generate exactly three plausible but incorrect options (distractors) based on the given question and correct answer. "
+    "Output the distractors as plain text, one per line, without any numbering or special prefixes. "
+    "For example:\n"
+    "Principles of Database Management\n"
+    "Basics of Software Engineering\n"
+    "Elements of Computer Networking"
+)
+
+BATCH_SYSTEM_PROMPT = (
+    "You are an intelligent assistant specialized in generating multiple-choice questions. "
+    "You will receive a JSON array of objects with an id, a question and its correct answer. "
+    "For every object, generate exactly three plausible but incorrect options (distractors). "
+    "Respond with only a JSON array, no prose and no code fences, where each element is "
+    '{"id": <id>, "distractors": ["...", "...", "..."]}. For example:\n'
+    '[{"id": 0, "distractors": ["Principles of Database Management", "Basics of Software Engineering", '
+    '"Elements of Computer Networking"]}]'
+)
+
+
+# Token bucket shared by every caller in the process. A 429 pauses the whole bucket,
+# so concurrent workers back off together instead of each hammering the API.
+class TokenBucket():
+    def __init__(self, rate: float, capacity: int):
+        self.rate = rate
+        self.capacity = capacity
+        self.tokens = float(capacity)
+        self.updated = time.monotonic()
+        self.paused_until = 0.0
+        self._lock = threading.Lock()
+
+    def acquire(self):
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+                self.updated = now
+                if now >= self.paused_until and self.tokens >= 1:
+                    self.tokens -= 1
+                    return
+                wait = max(self.paused_until - now, (1 - self.tokens) / self.rate)
+            time.sleep(wait)
+
+    def pause(self, seconds: float):
+        with self._lock:
+            self.paused_until = max(self.paused_until, time.monotonic() + seconds)
+            self.tokens = 0.0
+
+
+_bucket = TokenBucket(RATE_PER_SECOND, BURST)
+_session = None
+_executor = None
+_init_lock = threading.Lock()
+
+
+# Threads and pooled sockets do not survive fork(); forked model workers build their own
+def _reset_after_fork():
+    global _bucket, _session, _executor, _init_lock
+    _bucket = TokenBucket(RATE_PER_SECOND, BURST)
+    _session = None
+    _executor = None
+    _init_lock = threading.Lock()
+
+
+if hasattr(os, 'register_at_fork'):
+    os.register_at_fork(after_in_child=_reset_after_fork)
+
+
+# One keep-alive connection pool for every distractor call in the process
+def is_configured():
+    return bool(XAI_API_KEY)
+
+
+def get_session():
+    global _session
+    with _init_lock:
+        if _session is None:
+            _session = requests.Session()
+            _session.mount('https://', HTTPAdapter(pool_connections=1, pool_maxsize=MAX_CONCURRENCY))
+            _session.mount('http://', HTTPAdapter(pool_connections=1, pool_maxsize=MAX_CONCURRENCY))
+            _session.headers.update({
+                "Content-Type": "application/json",
+                "Authorization": f"Bearer {XAI_API_KEY}"
+            })
+    return _session
+
+
+def _retry_after(response, retry):
+    try:
+        return float(response.headers.get('Retry-After', ''))
+    except ValueError:
+        return float(2 ** retry)
+
+
+# POST a chat completion, respecting the shared rate limit; returns the message text or None
+def chat_completion(messages, temperature=0.7):
+    with instrumentation.stage("distractor_api") as counts:
+        return _chat_completion(messages, temperature, counts)
+
+
+def _chat_completion(messages, temperature, counts):
+    payload = {
+        "messages": messages,
+        "model": XAI_MODEL,
+        "stream": False,
+        "temperature": temperature
+    }
+    for retry in range(MAX_RETRIES):
+        _bucket.acquire()
+        counts["attempts"] = retry + 1
+        try:
+            response = get_session().post(XAI_API_URL, json=payload, timeout=REQUEST_TIMEOUT)
+        except requests.RequestException as e:
+            print(f"Distractor request failed: {e}", file=sys.stderr)
+            continue
+        if response.status_code == 200:
+            try:
+                content = response.json()['choices'][0]['message']['content']
+            except (ValueError, KeyError, IndexError, TypeError):
+                content = None  # Not JSON, or not a chat completion
+            if isinstance(content, str):
+                return content
+            print(f"Unexpected distractor response: {response.text[:200]}", file=sys.stderr)
+            break
+        if response.status_code == 429:  # Rate limit exceeded
+            delay = _retry_after(response, retry)
+            print(f"Rate limit hit. Retrying after {delay}s...", file=sys.stderr)
+            _bucket.pause(delay)
+        else:
+            print(f"Error: {response.status_code}, {response.text}", file=sys.stderr)
+            break
+    return None
+
+
+def parse_distractor_lines(content):
+    distractors = content.strip().split("\n")
+    return [distractor.strip("-").strip() for distractor in distractors if distractor.strip()]
+
+
+def generate_distractors_xai(question, correct_answer):
+    content = chat_completion([
+        {"role": "system", "content": SYSTEM_PROMPT},
+        {"role": "user", "content": f"Question: {question} Correct Answer: {correct_answer}. Generate three distractors."}
+    ])
+    if content is None:
+        return list(FALLBACK_DISTRACTORS)
+    return parse_distractor_lines(content)
+
+
+# Per-item distractor lists from a batched reply; items that are missing or malformed map to None
+def parse_batch_response(content, count):
+    results = [None] * count
+    text = re.sub(r"^```(?:json)?\s*|\s*```$", "", content.strip())
+    try:
+        items = json.loads(text)
+    except ValueError:
+        return results
+    if not isinstance(items, list):
+        return results
+    for item in items:
+        if not isinstance(item, dict):
+            continue
+        item_id = item.get("id")
+        options = item.get("distractors")
+        if not isinstance(item_id, int) or not 0 <= item_id < count or not isinstance(options, list):
+            continue
+        options = [str(option).strip() for option in options if str(option).strip()]
+        if options:
+            results[item_id] = options[:3]
+    return results
+
+
+# One chat completion for several (question, answer) pairs. Items the reply leaves out or
+# garbles go through the single-question path; when the call itself fails (API down, rate
+# limit retries exhausted) the whole batch gets the fallback options rather than one more
+# retried call per item.
+def generate_distractors_batch(pairs):
+    if len(pairs) == 1:
+        return [generate_distractors_xai(*pairs[0])]
+
+    request = [{"id": i, "question": question, "answer": answer} for i, (question, answer) in enumerate(pairs)]
+    content = chat_completion([
+        {"role": "system", "content": BATCH_SYSTEM_PROMPT},
+        {"role": "user", "content": json.dumps(request)}
+    ])
+    if content is None:
+        return [list(FALLBACK_DISTRACTORS) for _ in pairs]
+    results = parse_batch_response(content, len(pairs))
+    for i, options in enumerate(results):
+        if options is None:
+            results[i] = generate_distractors_xai(*pairs[i])
+    return results
+
+
+def set_batch_size(batch_size):
+    global BATCH_SIZE
+    BATCH_SIZE = max(1, batch_size)
+
+
+def _get_executor():
+    global _executor
+    with _init_lock:
+        if _executor is None:
+            _executor = ThreadPoolExecutor(max_workers=MAX_CONCURRENCY, thread_name_prefix='distractors')
+    return _executor
+
+
+# Start a distractor call in the background; the Future resolves to a list of strings.
+def submit_distractors(question, correct_answer):
+    return _get_executor().submit(instrumentation.bind(generate_distractors_xai), question, correct_answer)
+
+
+# Groups questions into batched calls as they arrive; each full group is submitted at once
+# so the calls still overlap whatever the caller does next.
+class DistractorBatcher():
+    def __init__(self, batch_size: int = None):
+        self.batch_size = batch_size or BATCH_SIZE
+        self._pending = []
+        self._futures = []
+
+    def add(self, key, question, correct_answer):
+        self._pending.append((key, question, correct_answer))
+        if len(self._pending) >= self.batch_size:
+            self.flush()
+
+    def flush(self):
+        if not self._pending:
+            return
+        keys = [key for key, _, _ in self._pending]
+        pairs = [(question, answer) for _, question, answer in self._pending]
+        self._futures.append((keys, _get_executor().submit(instrumentation.bind(generate_distractors_batch), pairs)))
+        self._pending = []
+
+    # Distractors from calls that have already finished, without waiting. Each key is
+    # returned once, by ready(), iter_results() or results().
+    def ready(self):
+        collected, running = {}, []
+        for keys, future in self._futures:
+            if future.done():
+                collected.update(zip(keys, future.result()))
+            else:
+                running.append((keys, future))
+        self._futures = running
+        return collected
+
+    # Submits what is left and yields {key: distractor list} per call as each one finishes
+    def iter_results(self):
+        self.flush()
+        futures, self._futures = dict((future, keys) for keys, future in self._futures), []
+        for future in as_completed(futures):
+            yield dict(zip(futures[future], future.result()))
+
+    # Waits for every submitted call; returns {key: distractor list}
+    def results(self):
+        collected = {}
+        for finished in self.iter_results():
+            collected.update(finished)
+        return collected
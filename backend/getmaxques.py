@@ -1,32 +1,27 @@
+import time
+_import_started = time.perf_counter()
+
 import argparse
-import requests
-from bs4 import BeautifulSoup
-from nltk.tokenize import sent_tokenize
 import json
-import PyPDF2
+import instrumentation
+import upload_cache
 
-# Function to split content into chunks
-def split_into_chunks(text, max_sentences_per_chunk=6):
-    sentences = sent_tokenize(text)
-    chunks = [" ".join(sentences[i:i + max_sentences_per_chunk]) for i in range(0, len(sentences), max_sentences_per_chunk)]
-    return chunks
+instrumentation.mark_import("getmaxques", time.perf_counter() - _import_started)
 
-# Fetch content from a URL
+# Fetch content from a URL; trace=True adds a per-stage timing trace
+@instrumentation.traced
 def generate_questions_from_file(file_path):
+    # The full chunk list is cached by content hash, so main.py --file on the same upload
+    # skips PDF parsing and sentence splitting
     try:
-        #print(f"Attempting to read file: {file_path}")
-        with open(file_path, 'rb') as pdf_file:
-            reader = PyPDF2.PdfReader(pdf_file)
-            content = ""
-            for page in reader.pages:
-                content += page.extract_text() + "\n"
-        #print("File read successfully.")
+        with instrumentation.stage("upload_chunks") as counts:
+            chunks, stats = upload_cache.get_chunks(file_path)
+            counts["chunks"] = len(chunks)
     except Exception as e:
         return {"error": f"Error reading the PDF file: {str(e)}"}
 
-    chunks = split_into_chunks(content, max_sentences_per_chunk=6)
-    max_questions = len(chunks) - 1
-    return {"max_questions": max_questions, "message": "Success"}
+    max_questions = len(chunks)  # Each chunk represents one potential question, as in getnumques.py
+    return {"max_questions": max_questions, "message": "Success", **stats}
 
 
 
@@ -34,12 +29,13 @@ if __name__ == "__main__":
     parser = argparse.ArgumentParser(description="Get maximum number of questions possible")
     
     parser.add_argument('--file', help="Path to the uploaded file")
+    parser.add_argument('--trace', action='store_true', help="Add a per-stage timing trace to the result")
 
     args = parser.parse_args()
 
     try:
         if args.file:
-            result = generate_questions_from_file(args.file)
+            result = generate_questions_from_file(args.file, trace=args.trace)
         
         else:
             raise ValueError("Either --file or both --topic and --subTopic must be provided.")
@@ -0,0 +1,168 @@
+import contextvars
+import functools
+import threading
+import time
+from collections import OrderedDict
+from contextlib import contextmanager
+
+# Upper bounds (seconds) of the stage histogram buckets; the last bucket is +Inf
+BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60)
+METRIC_PREFIX = 'quizzllm'
+
+_current_trace = contextvars.ContextVar('quizzllm_trace', default=None)
+IMPORT_SECONDS = OrderedDict()  # Module -> seconds its top-level imports took
+
+
+# Per-request record of stages: wall time, call count and any counts (tokens, chunks, ...)
+# summed per stage name. Stages from threads that run work for the request join the same trace
+# when their work is submitted through bind().
+class Trace():
+    def __init__(self):
+        self.started = time.perf_counter()
+        self.stages = OrderedDict()
+        self._lock = threading.Lock()
+
+    def record(self, name, seconds, counts=None):
+        with self._lock:
+            stage = self.stages.setdefault(name, {"calls": 0, "seconds": 0.0})
+            stage["calls"] += 1
+            stage["seconds"] += seconds
+            for key, value in (counts or {}).items():
+                stage[key] = stage.get(key, 0) + value
+
+    def to_dict(self) -> dict:
+        with self._lock:
+            stages = OrderedDict(
+                (name, {key: round(value, 4) if isinstance(value, float) else value for key, value in stage.items()})
+                for name, stage in self.stages.items()
+            )
+        return {
+            "total_seconds": round(time.perf_counter() - self.started, 4),
+            "imports": {module: round(seconds, 4) for module, seconds in IMPORT_SECONDS.items()},
+            "stages": stages
+        }
+
+
+# Process-wide histograms of stage time plus counters, rendered in the Prometheus text format
+class Metrics():
+    def __init__(self, buckets=BUCKETS):
+        self.buckets = buckets
+        self._histograms = OrderedDict()  # stage -> [bucket counts, sum, count]
+        self._counters = OrderedDict()  # (name, sorted label items) -> value
+        self._lock = threading.Lock()
+
+    def observe(self, name, seconds, counts=None):
+        with self._lock:
+            histogram = self._histograms.setdefault(name, [[0] * len(self.buckets), 0.0, 0])
+            for i, bound in enumerate(self.buckets):
+                if seconds <= bound:
+                    histogram[0][i] += 1
+            histogram[1] += seconds
+            histogram[2] += 1
+        for key, value in (counts or {}).items():
+            self.increment(key, value, stage=name)
+
+    def increment(self, name, value=1, **labels):
+        key = (name, tuple(sorted(labels.items())))
+        with self._lock:
+            self._counters[key] = self._counters.get(key, 0) + value
+
+    def render(self) -> str:
+        lines = []
+        with self._lock:
+            histograms = [(name, list(buckets), total, count) for name, (buckets, total, count) in self._histograms.items()]
+            counters = list(self._counters.items())
+
+        metric = f"{METRIC_PREFIX}_stage_seconds"
+        lines += [f"# HELP {metric} Wall time of each pipeline stage", f"# TYPE {metric} histogram"]
+        for name, buckets, total, count in histograms:
+            for bound, bucket_count in zip(self.buckets, buckets):
+                lines.append(f'{metric}_bucket{{stage="{_escape(name)}",le="{bound:g}"}} {bucket_count}')
+            lines.append(f'{metric}_bucket{{stage="{_escape(name)}",le="+Inf"}} {count}')
+            lines.append(f'{metric}_sum{{stage="{_escape(name)}"}} {total:.6f}')
+            lines.append(f'{metric}_count{{stage="{_escape(name)}"}} {count}')
+
+        # Every sample of a metric has to follow its TYPE line, so group counters by name
+        by_name = OrderedDict()
+        for (name, labels), value in counters:
+            by_name.setdefault(name, []).append((labels, value))
+        for name, samples in by_name.items():
+            metric = f"{METRIC_PREFIX}_{name}_total"
+            lines.append(f"# TYPE {metric} counter")
+            for labels, value in samples:
+                label_text = ",".join(f'{key}="{_escape(label)}"' for key, label in labels)
+                lines.append(f"{metric}{{{label_text}}} {value}" if label_text else f"{metric} {value}")
+
+        if IMPORT_SECONDS:
+            metric = f"{METRIC_PREFIX}_import_seconds"
+            lines += [f"# HELP {metric} Time spent importing each entry module's dependencies", f"# TYPE {metric} gauge"]
+            for module, seconds in IMPORT_SECONDS.items():
+                lines.append(f'{metric}{{module="{_escape(module)}"}} {seconds:.6f}')
+        return "\n".join(lines) + "\n"
+
+
+def _escape(value):
+    return str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+
+METRICS = Metrics()
+
+
+def record(name, seconds, counts=None):
+    METRICS.observe(name, seconds, counts)
+    trace = _current_trace.get()
+    if trace is not None:
+        trace.record(name, seconds, counts)
+
+
+# Times the block as stage `name`. The yielded dict holds the stage's counts; add to it
+# inside the block for anything only known at the end (e.g. output tokens).
+@contextmanager
+def stage(name, **counts):
+    started = time.perf_counter()
+    try:
+        yield counts
+    finally:
+        record(name, time.perf_counter() - started, counts)
+
+
+def increment(name, value=1, **labels):
+    METRICS.increment(name, value, **labels)
+
+
+def mark_import(module, seconds):
+    IMPORT_SECONDS[module] = seconds
+
+
+@contextmanager
+def tracing():
+    trace = Trace()
+    token = _current_trace.set(trace)
+    try:
+        yield trace
+    finally:
+        _current_trace.reset(token)
+
+
+# fn bound to the caller's trace, for handing work to a thread pool
+def bind(fn):
+    return functools.partial(contextvars.copy_context().run, fn)
+
+
+# Adds a trace=False keyword to a function returning a result dict; with trace=True the
+# call runs under a fresh trace that is returned as result["trace"]
+def traced(fn):
+    @functools.wraps(fn)
+    def wrapper(*args, trace=False, **kwargs):
+        if not trace:
+            return fn(*args, **kwargs)
+        with tracing() as current:
+            result = fn(*args, **kwargs)
+        if isinstance(result, dict):
+            result = {**result, "trace": current.to_dict()}
+        return result
+    return wrapper
+
+
+def render_prometheus() -> str:
+    return METRICS.render()
@@ -0,0 +1,182 @@
+import heapq
+import itertools
+import threading
+import time
+import uuid
+from collections import OrderedDict
+
+MAX_QUEUED_JOBS = 100  # Submissions beyond this are refused rather than queued forever
+MAX_FINISHED_JOBS = 200  # Oldest finished jobs are forgotten above this
+FINISHED_STATES = ("done", "failed", "cancelled")
+
+
+class JobQueueFull(RuntimeError):
+    pass
+
+
+class JobCancelled(Exception):
+    pass
+
+
+# One generation request. Every change bumps `version` so pollers can wait for the next one.
+class Job():
+    def __init__(self, params: dict, priority: int = 0):
+        self.id = uuid.uuid4().hex
+        self.params = params
+        self.priority = priority
+        self.status = "queued"
+        self.completed = 0
+        self.total = None
+        self.questions = []  # Finished questions in completion order
+        self.result = None
+        self.error = None
+        self.cancel_requested = False
+        self.created_at = time.time()
+        self.started_at = None
+        self.finished_at = None
+        self.version = 0
+
+    @property
+    def finished(self):
+        return self.status in FINISHED_STATES
+
+    # Poll response; `since` skips questions the client already has
+    def snapshot(self, since: int = 0) -> dict:
+        snapshot = {
+            "jobId": self.id,
+            "status": self.status,
+            "priority": self.priority,
+            "progress": {"completed": self.completed, "total": self.total},
+            "questions": self.questions[since:],
+            "next": len(self.questions),
+            "version": self.version
+        }
+        if self.result is not None:
+            snapshot["result"] = self.result
+        if self.error is not None:
+            snapshot["error"] = self.error
+        return snapshot
+
+
+# In-process priority queue with a fixed pool of worker threads. Higher priority runs first,
+# ties in submission order. run_job(params, progress) does the work and returns the result;
+# progress(completed, total, record) reports each resolved chunk.
+class JobQueue():
+    def __init__(self, run_job, workers: int = 1, max_queued: int = MAX_QUEUED_JOBS,
+                 max_finished: int = MAX_FINISHED_JOBS):
+        self.run_job = run_job
+        self.max_queued = max_queued
+        self.max_finished = max_finished
+        self._heap = []
+        self._order = itertools.count()
+        self._jobs = OrderedDict()
+        self._changed = threading.Condition()
+        self._closed = False
+        self._threads = [
+            threading.Thread(target=self._work, name=f'job-worker-{i}', daemon=True) for i in range(max(1, workers))
+        ]
+        for thread in self._threads:
+            thread.start()
+
+    def submit(self, params: dict, priority: int = 0) -> Job:
+        job = Job(params, priority)
+        with self._changed:
+            if len(self._heap) >= self.max_queued:
+                raise JobQueueFull(f"Job queue is full ({self.max_queued} jobs waiting)")
+            self._jobs[job.id] = job
+            heapq.heappush(self._heap, (-priority, next(self._order), job))
+            self._changed.notify_all()
+        return job
+
+    def get(self, job_id: str):
+        with self._changed:
+            return self._jobs.get(job_id)
+
+    # Queued jobs are dropped at once; running jobs stop at their next progress report
+    def cancel(self, job_id: str) -> bool:
+        with self._changed:
+            job = self._jobs.get(job_id)
+            if job is None or job.finished:
+                return False
+            job.cancel_requested = True
+            if job.status == "queued":
+                self._heap = [entry for entry in self._heap if entry[2] is not job]
+                heapq.heapify(self._heap)
+                self._finish(job, "cancelled")
+            return True
+
+    # Block until the job changes past `version`, finishes, or the timeout passes
+    def wait(self, job: Job, version: int, timeout: float = None) -> Job:
+        with self._changed:
+            self._changed.wait_for(lambda: job.version > version or job.finished, timeout)
+            return job
+
+    def stats(self) -> dict:
+        with self._changed:
+            counts = {}
+            for job in self._jobs.values():
+                counts[job.status] = counts.get(job.status, 0) + 1
+            return {"queued": len(self._heap), "workers": len(self._threads), "jobs": counts}
+
+    def close(self):
+        with self._changed:
+            self._closed = True
+            self._changed.notify_all()
+
+    def _next_job(self):
+        with self._changed:
+            while not self._heap and not self._closed:
+                self._changed.wait()
+            if self._closed:
+                return None
+            _, _, job = heapq.heappop(self._heap)
+            job.status = "running"
+            job.started_at = time.time()
+            self._bump(job)
+            return job
+
+    def _work(self):
+        while True:
+            job = self._next_job()
+            if job is None:
+                return
+            try:
+                result = self.run_job(job.params, lambda completed, total, record: self._progress(job, completed, total, record))
+            except JobCancelled:
+                with self._changed:
+                    self._finish(job, "cancelled")
+            except Exception as e:
+                with self._changed:
+                    job.error = f"Error occurred: {e}"
+                    self._finish(job, "failed")
+            else:
+                with self._changed:
+                    job.result = result
+                    if isinstance(result, dict) and result.get("error"):
+                        job.error = result["error"]
+                        self._finish(job, "failed")
+                    else:
+                        self._finish(job, "done")
+
+    def _progress(self, job, completed, total, record):
+        with self._changed:
+            if job.cancel_requested:
+                raise JobCancelled()
+            job.completed = completed
+            job.total = total
+            if record is not None:
+                job.questions.append(record)
+            self._bump(job)
+
+    # Callers hold self._changed
+    def _bump(self, job):
+        job.version += 1
+        self._changed.notify_all()
+
+    def _finish(self, job, status):
+        job.status = status
+        job.finished_at = time.time()
+        self._bump(job)
+        finished = [job_id for job_id, other in self._jobs.items() if other.finished]
+        for job_id in finished[:max(0, len(finished) - self.max_finished)]:
+            del self._jobs[job_id]
@@ -0,0 +1,166 @@
+import re
+from collections import Counter
+
+import numpy as np
+
+import instrumentation
+from text_features import STOPWORDS, WORD_RE, feature_hash
+
+HASH_DIM = 1 << 10  # Hashed feature space for words and character trigrams
+MAX_PHRASE_WORDS = 3
+NUM_DISTRACTORS = 3
+PARAPHRASE_SIMILARITY = 0.9  # Candidates this close to the answer restate it
+DUPLICATE_SIMILARITY = 0.8  # Picks this close to an earlier pick are skipped
+CONTEXT_WEIGHT = 0.4  # Share of the score from chunk co-occurrence rather than surface form
+
+FALLBACK_DISTRACTORS = ["None of the above", "Not sure", "All of the above"]
+
+_SPLIT_RE = re.compile(r"[.,;:!?()\[\]{}\"]|\s-\s")
+_SUFFIX_RE = re.compile(r"(?:ing|ed|es|s|e)$")
+
+
+def _features(phrase):
+    words = phrase.lower().split()
+    features = ['w:' + word for word in words]
+    padded = f" {phrase.lower()} "
+    features += ['c:' + padded[i:i + 3] for i in range(len(padded) - 2)]
+    return features
+
+
+# Crude suffix stripping so "paging"/"page" and "scheduled"/"scheduling" compare equal
+def _stem(word):
+    return _SUFFIX_RE.sub('', word) if len(word) > 3 else word
+
+
+def _stems(words):
+    return frozenset(_stem(word) for word in words)
+
+
+def _content_words(text):
+    return {token.lower() for token in WORD_RE.findall(text) if token.lower() not in STOPWORDS}
+
+
+def _normalize(matrix):
+    norms = np.linalg.norm(matrix, axis=-1, keepdims=True)
+    return matrix / np.maximum(norms, 1e-9)
+
+
+# Maximal runs of non-stopword tokens and their sub-phrases, e.g. "round robin scheduling",
+# with occurrence counts
+def extract_candidates(text):
+    candidates = Counter()
+    for segment in _SPLIT_RE.split(text):
+        run = []
+        for token in WORD_RE.findall(segment) + [None]:
+            if token is not None and token.lower() not in STOPWORDS and len(token) > 2:
+                run.append(token)
+                continue
+            for size in range(1, MAX_PHRASE_WORDS + 1):
+                for start in range(0, len(run) - size + 1):
+                    candidates[" ".join(run[start:start + size])] += 1
+            run = []
+    return candidates
+
+
+# Ranks noun-phrase-like candidates mined from one subtopic's chunks against the correct
+# answer by two cosine similarities: hashed TF-IDF of the surface form, and which chunks
+# the phrase occurs in (terms discussed alongside the answer). Each is one matrix-vector product.
+class LocalDistractorEngine():
+    def __init__(self, chunks: list):
+        counts = Counter()
+        per_chunk = []
+        for chunk in chunks:
+            found = extract_candidates(chunk)
+            per_chunk.append(found)
+            counts.update(found)
+        self.phrases = sorted(counts)
+        self._lower = [phrase.lower() for phrase in self.phrases]
+        self._words = [set(phrase.split()) for phrase in self._lower]
+        self._stems = [_stems(words) for words in self._words]
+        self._chunks = [chunk.lower() for chunk in chunks]
+        # Phrases that recur are more likely real terms than accidental word runs
+        self.prior = 0.05 * np.log1p(np.array([counts[p] for p in self.phrases], dtype=np.float32))
+        self.lengths = np.array([len(words) for words in self._words], dtype=np.float32)
+
+        # Document frequency of each hashed feature across chunks -> smoothed IDF
+        df = np.zeros(HASH_DIM, dtype=np.float32)
+        for chunk in chunks:
+            df[np.unique([feature_hash(f, HASH_DIM) for f in _features(chunk)])] += 1
+        self.idf = np.log((1 + len(chunks)) / (1 + df)) + 1
+
+        self.matrix = self._vectorize(self.phrases)
+
+        # Phrase x chunk occurrence matrix, rows normalized
+        row_of = {phrase: row for row, phrase in enumerate(self.phrases)}
+        occurrences = np.zeros((len(self.phrases), max(len(chunks), 1)), dtype=np.float32)
+        for col, found in enumerate(per_chunk):
+            occurrences[[row_of[phrase] for phrase in found], col] = 1.0
+        self.context = _normalize(occurrences)
+        self._pending = {}
+
+    def _vectorize(self, phrases):
+        rows, cols = [], []
+        for row, phrase in enumerate(phrases):
+            hashed = [feature_hash(f, HASH_DIM) for f in _features(phrase)]
+            rows.extend([row] * len(hashed))
+            cols.extend(hashed)
+        matrix = np.zeros((len(phrases), HASH_DIM), dtype=np.float32)
+        np.add.at(matrix, (np.array(rows, dtype=np.intp), np.array(cols, dtype=np.intp)), 1.0)
+        return _normalize(matrix * self.idf)
+
+    def distractors(self, question: str, answer: str, k: int = NUM_DISTRACTORS) -> list:
+        if not self.phrases:
+            return list(FALLBACK_DISTRACTORS[:k])
+
+        answer_lower = answer.lower().strip()
+        answer_words = _content_words(answer)
+        answer_stems = _stems(answer_words)
+        # Words that give the question away; a distractor repeating them is an obvious wrong pick
+        question_words = _content_words(question) - answer_words
+        similarity = self.matrix @ self._vectorize([answer])[0]
+        answer_chunks = np.array([answer_lower in chunk for chunk in self._chunks], dtype=np.float32)
+        if answer_chunks.any():
+            scores = (1 - CONTEXT_WEIGHT) * similarity + CONTEXT_WEIGHT * (self.context @ _normalize(answer_chunks))
+        else:
+            scores = similarity.copy()
+        # Prefer recurring candidates of similar length to the answer
+        scores += self.prior - 0.05 * np.abs(self.lengths - len(answer.split()))
+
+        picked, picked_rows, picked_stems = [], [], []
+        for row in np.argsort(-scores):
+            phrase = self._lower[row]
+            if phrase == answer_lower or phrase in answer_lower or answer_lower in phrase:
+                continue
+            if phrase.endswith('ed'):  # Participles such as "blocked" read as verbs, not options
+                continue
+            if similarity[row] >= PARAPHRASE_SIMILARITY or self._words[row] & question_words:
+                continue
+            # Inflections of the answer ("page" for "paging"), or a pick that contains another
+            stems = self._stems[row]
+            if any(stems <= other or other <= stems for other in picked_stems) or any(
+                    word not in answer_words and _stem(word) in answer_stems for word in self._words[row]):
+                continue
+            if picked_rows and float((self.matrix[picked_rows] @ self.matrix[row]).max()) >= DUPLICATE_SIMILARITY:
+                continue
+            picked.append(self.phrases[row])
+            picked_rows.append(row)
+            picked_stems.append(stems)
+            if len(picked) == k:
+                break
+
+        return picked + FALLBACK_DISTRACTORS[:k - len(picked)]
+
+    # Same add/ready/iter_results/results interface as distractors.DistractorBatcher
+    def add(self, key, question, correct_answer):
+        with instrumentation.stage("local_distractors"):
+            self._pending[key] = self.distractors(question, correct_answer)
+
+    def ready(self):
+        return self.results()
+
+    def iter_results(self):
+        yield self.results()
+
+    def results(self):
+        results, self._pending = self._pending, {}
+        return results
@@ -1,12 +1,12 @@
 import argparse
 import json
-import requests
-from bs4 import BeautifulSoup
 from nltk.tokenize import sent_tokenize
 from transformers import T5ForConditionalGeneration, T5TokenizerFast as T5Tokenizer
 import pytorch_lightning as pl
 # from torch.optim import AdamW
 from huggingface_hub import hf_hub_download
+from content_cache import get_geeksforgeeks_content
+import catalog
 from transformers import (
     AdamW,
     T5ForConditionalGeneration,
@@ -124,70 +124,13 @@ def split_into_chunks(text, max_sentences_per_chunk=5):
     return chunks
 
 
-def get_geeksforgeeks_content(url):
-    """Fetch and extract meaningful content from a GeeksforGeeks article."""
-    try:
-        headers = {'User-Agent': 'Mozilla/5.0'}
-        response = requests.get(url, headers=headers)
-        
-        if response.status_code == 200:
-            soup = BeautifulSoup(response.text, 'html.parser')
-            
-            # Extract the article title
-            title = soup.find('h1').get_text(strip=True)
-            
-            # Extract content within <article> or other main content sections
-            content_section = soup.find('div', {'class': 'entry-content'})
-            if not content_section:
-                content_section = soup.find('article')
-            
-            # Extract paragraphs from the main content section
-            paragraphs = content_section.find_all('p')
-            content = ' '.join([para.get_text(strip=True) for para in paragraphs])
-            
-            return f"Title: {title}\n\nContent:\n{content}"
-        else:
-            return f"Failed to retrieve content. HTTP Status Code: {response.status_code}"
-    except Exception as e:
-        return f"Error occurred: {e}"
-
 # Main function to handle argument passing and scraping
 def generate_questions(topic, subTopic, questionType, numQuestions):
-    # Define URLs for topics
-    urls = {
-        # Topics for OS
-        "OS": {
-            "OS Basics": "https://www.geeksforgeeks.org/what-is-an-operating-system/?ref=lbp",
-            "Structure of Operating Systems": "https://www.geeksforgeeks.org/operating-system-services/?ref=lbp",
-            "Types of OS": "https://www.geeksforgeeks.org/batch-processing-operating-system/?ref=lbp",
-            "Process Management": "https://www.geeksforgeeks.org/introduction-of-process-management/?ref=lbp",
-            "CPU Scheduling in OS": "https://www.geeksforgeeks.org/cpu-scheduling-in-operating-systems/?ref=lbp",
-            "Threads in OS": "https://www.geeksforgeeks.org/thread-in-operating-system/?ref=lbp",
-            "Process Synchronization": "https://www.geeksforgeeks.org/introduction-of-process-synchronization/?ref=lbp",
-            "Critical Section Problem Execution": "https://www.geeksforgeeks.org/petersons-algorithm-in-process-synchronization/?ref=lbp",
-            "Deadlocks & Deadlock Handling Methods": "https://www.geeksforgeeks.org/introduction-of-deadlock-in-operating-system/?ref=lbp",
-            "Memory Management": "https://www.geeksforgeeks.org/memory-management-in-operating-system/?ref=lbp",
-            "Page Replacement Algorithms": "https://www.geeksforgeeks.org/page-replacement-algorithms-in-operating-systems/?ref=lbp",
-            "Storage Management": "https://www.geeksforgeeks.org/storage-management/?ref=lbp"
-        },
-        # Topics for DBMS
-        "DBMS": {
-            "Basics of DBMS": "https://www.geeksforgeeks.org/introduction-of-dbms-database-management-system-set-1/?ref=lbp",
-            "Entity Relationship Model": "https://www.geeksforgeeks.org/introduction-of-er-model/?ref=lbp",
-            "Relational Model": "https://www.geeksforgeeks.org/introduction-of-relational-model-and-codd-rules-in-dbms/?ref=lbp",
-            "Relational Algebra": "https://www.geeksforgeeks.org/introduction-of-relational-algebra-in-dbms/?ref=lbp",
-            "Functional Dependencies": "https://www.geeksforgeeks.org/functional-dependency-and-attribute-closure/?ref=lbp",
-            "Normalisation": "https://www.geeksforgeeks.org/introduction-of-database-normalization/?ref=lbp",
-            "Transactions and Concurrency Control": "https://www.geeksforgeeks.org/concurrency-control-in-dbms/?ref=lbp",
-            "Indexing, B and B+ Trees": "https://www.geeksforgeeks.org/indexing-in-databases-set-1/?ref=lbp",
-            "File Organisation": "https://www.geeksforgeeks.org/file-organization-in-dbms-set-1/?ref=lbp"
-        }
-    }
-
     # Fetch URL based on selected topic and sub-topic
-    selected_url = urls.get(topic, {}).get(subTopic, None)
-    if not selected_url:
+    entry = catalog.get_entry(topic, subTopic)
+    if entry is None:
         return {"questions": []}
+    selected_url = entry["url"]
 
     # Scrape the content
     context = get_geeksforgeeks_content(selected_url)
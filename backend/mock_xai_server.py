@@ -0,0 +1,103 @@
+import argparse
+import json
+import re
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+DEFAULT_PORT = 5003
+
+
+# Deterministic stand-ins for the distractors of one question
+def fake_distractors(answer):
+    return [f"Not {answer}", f"{answer} variant", f"Unrelated to {answer}"]
+
+
+# Local stand-in for the x.ai chat-completions endpoint. Point XAI_API_URL at
+# http://127.0.0.1:<port>/v1/chat/completions, with any XAI_API_KEY, to run MCQ generation offline.
+class MockChatHandler(BaseHTTPRequestHandler):
+    def do_POST(self):
+        length = int(self.headers.get('Content-Length', 0))
+        payload = json.loads(self.rfile.read(length) or b'{}')
+
+        with self.server.lock:
+            self.server.requests += 1
+            count = self.server.requests
+            self.server.in_flight += 1
+            self.server.max_in_flight = max(self.server.max_in_flight, self.server.in_flight)
+        try:
+            time.sleep(self.server.latency)
+            if self.server.rate_limit_every and count % self.server.rate_limit_every == 0:
+                self._send(429, {"error": "rate limited"}, {'Retry-After': '0.2'})
+                return
+            self._send(200, {"choices": [{"message": {"role": "assistant", "content": self.server.reply(payload)}}]})
+        finally:
+            with self.server.lock:
+                self.server.in_flight -= 1
+
+    def _send(self, status, body, headers=None):
+        data = json.dumps(body).encode('utf-8')
+        self.send_response(status)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(data)))
+        for name, value in (headers or {}).items():
+            self.send_header(name, value)
+        self.end_headers()
+        self.wfile.write(data)
+
+    def log_message(self, format, *args):
+        pass
+
+
+class MockChatServer(ThreadingHTTPServer):
+    daemon_threads = True
+
+    def __init__(self, address, latency=0.0, rate_limit_every=0, drop_every=0):
+        super().__init__(address, MockChatHandler)
+        self.latency = latency
+        self.rate_limit_every = rate_limit_every
+        self.drop_every = drop_every  # Leave every Nth item out of batched replies
+        self.lock = threading.Lock()
+        self.requests = 0
+        self.in_flight = 0
+        self.max_in_flight = 0
+
+    def reply(self, payload):
+        prompt = payload['messages'][-1]['content']
+        if prompt.lstrip().startswith('['):
+            # Batched request: JSON array of {id, question, answer}
+            items = [
+                {"id": item["id"], "distractors": fake_distractors(item["answer"])}
+                for item in json.loads(prompt)
+                if not (self.drop_every and (item["id"] + 1) % self.drop_every == 0)
+            ]
+            return json.dumps(items)
+        answer = re.search(r"Correct Answer: (.*?)\. Generate", prompt, re.S)
+        return "\n".join(fake_distractors(answer.group(1) if answer else "the answer"))
+
+    @property
+    def url(self):
+        return f"http://127.0.0.1:{self.server_port}/v1/chat/completions"
+
+
+# Start a mock server on a background thread (port 0 picks a free port)
+def start_mock_server(port=0, latency=0.0, rate_limit_every=0, drop_every=0):
+    server = MockChatServer(('127.0.0.1', port), latency, rate_limit_every, drop_every)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Run a local stand-in for the x.ai chat-completions API")
+    parser.add_argument('--port', type=int, default=DEFAULT_PORT, help="Port to listen on")
+    parser.add_argument('--latency', type=float, default=0.5, help="Seconds to wait before each reply")
+    parser.add_argument('--rateLimitEvery', type=int, default=0, help="Answer every Nth request with HTTP 429")
+    parser.add_argument('--dropEvery', type=int, default=0, help="Omit every Nth item from batched replies")
+
+    args = parser.parse_args()
+    server = MockChatServer(('127.0.0.1', args.port), args.latency, args.rateLimitEvery, args.dropEvery)
+    print(f"Mock x.ai endpoint at {server.url}", flush=True)
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
@@ -0,0 +1,13 @@
+import os
+import threading
+
+BACKEND_DIR = os.path.dirname(os.path.abspath(__file__))
+# Every on-disk cache (pages, chunk index, uploads, questions, history, bank) lives under
+# CACHE_ROOT; QUIZZLLM_CACHE_DIR relocates them all together
+CACHE_ROOT = os.environ.get('QUIZZLLM_CACHE_DIR', os.path.join(BACKEND_DIR, 'cache'))
+
+
+# A temp file beside `path` that no other process or thread writes to. Cache files are written
+# there and os.replace()d into place, so concurrent writers of one entry never share a file.
+def temp_path(path):
+    return f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
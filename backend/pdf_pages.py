@@ -0,0 +1,60 @@
+import argparse
+import json
+import os
+import sys
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+
+import PyPDF2
+
+PAGES_PER_TASK = 8  # Page range handed to one worker at a time
+
+
+# Page texts in order, one page extracted at a time
+def iter_pages(reader, start=0, stop=None):
+    for page_number in range(start, len(reader.pages) if stop is None else stop):
+        yield page_number, reader.pages[page_number].extract_text() or ""
+
+
+# Runs in a worker process; each worker opens its own reader
+def extract_page_range(file_path, start, stop):
+    with open(file_path, 'rb') as pdf_file:
+        reader = PyPDF2.PdfReader(pdf_file)
+        return [text for _, text in iter_pages(reader, start, stop)]
+
+
+# Writes every page text as one JSON string per line, in page order. Ranges are submitted
+# a few at a time, so a reader that stops early leaves the rest of the document unread;
+# queued ranges are then cancelled and the workers exit once their current range is done.
+def write_pages(file_path, total_pages, workers, out, pages_per_task=PAGES_PER_TASK):
+    ranges = deque((start, min(start + pages_per_task, total_pages)) for start in range(0, total_pages, pages_per_task))
+    pool = ProcessPoolExecutor(max_workers=workers)
+    in_flight = deque()
+    try:
+        while ranges or in_flight:
+            while ranges and len(in_flight) < 2 * workers:
+                start, stop = ranges.popleft()
+                in_flight.append(pool.submit(extract_page_range, file_path, start, stop))
+            for text in in_flight.popleft().result():
+                out.write(json.dumps(text) + "\n")
+            out.flush()
+    finally:
+        pool.shutdown(wait=False, cancel_futures=True)
+
+
+# pdf_stream.py starts this file as its own interpreter for parallel extraction. Its pool
+# workers then start from an entry that imports PyPDF2 alone, instead of re-importing the
+# caller's entry script (main.py, with torch and transformers) in every worker.
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Extract PDF pages across a process pool as JSON lines")
+    parser.add_argument('--file', required=True, help="PDF to read")
+    parser.add_argument('--pages', type=int, required=True, help="Page count of the PDF")
+    parser.add_argument('--workers', type=int, required=True, help="Extraction processes")
+    parser.add_argument('--pagesPerTask', type=int, default=PAGES_PER_TASK, help="Pages handed to a worker at a time")
+
+    args = parser.parse_args()
+    try:
+        write_pages(args.file, args.pages, args.workers, sys.stdout, args.pagesPerTask)
+    except BrokenPipeError:
+        # The reader stopped early; point stdout at devnull so the flush at exit stays quiet
+        os.dup2(os.open(os.devnull, os.O_WRONLY), sys.stdout.fileno())
@@ -0,0 +1,143 @@
+import argparse
+import json
+import os
+import subprocess
+import sys
+
+import PyPDF2
+from nltk.tokenize import sent_tokenize
+
+from chunk_index import CHUNK_SENTENCES
+from pdf_pages import PAGES_PER_TASK, iter_pages
+
+PDF_PAGES_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'pdf_pages.py')
+
+PARALLEL_MIN_PAGES = 24  # Below this, starting the extraction processes costs more than it saves
+MAX_CARRY_CHARS = 2000  # A trailing fragment longer than this is emitted as is, not carried over
+
+
+def available_cpus():
+    try:
+        return len(os.sched_getaffinity(0))
+    except AttributeError:
+        return os.cpu_count() or 1
+
+
+# Worker count for a document: serial for short PDFs or single-core hosts unless forced
+def choose_workers(total_pages, workers=None):
+    if workers is None:
+        if total_pages < PARALLEL_MIN_PAGES:
+            return 1
+        workers = available_cpus()
+    return max(1, min(workers, -(-total_pages // PAGES_PER_TASK)))
+
+
+# Same output as iter_pages, with the pages extracted by pdf_pages.py in a fresh interpreter
+# that runs the process pool. Workers are never forked from the caller, which under --serve is
+# multi-threaded with torch loaded, and never re-import its entry script. Closing the
+# generator early closes the pipe, which stops the extraction after the ranges in progress.
+def iter_pages_parallel(file_path, total_pages, workers, pages_per_task=PAGES_PER_TASK):
+    command = [sys.executable, PDF_PAGES_PATH, '--file', file_path, '--pages', str(total_pages),
+               '--workers', str(workers), '--pagesPerTask', str(pages_per_task)]
+    process = subprocess.Popen(command, stdout=subprocess.PIPE, encoding='utf-8')
+    page_number = 0
+    try:
+        for line in process.stdout:
+            yield page_number, json.loads(line)
+            page_number += 1
+        if process.wait() != 0 or page_number != total_pages:
+            raise RuntimeError(f"PDF extraction stopped after {page_number} of {total_pages} pages")
+    finally:
+        process.stdout.close()
+        process.wait()
+
+
+# Sentences across page boundaries. The last sentence of a page is held back and joined
+# with the next page, since it usually continues there; only that tail is ever buffered.
+# Pages without sentence ends (tables, slides, scans) would grow the tail with every page,
+# so past MAX_CARRY_CHARS it is yielded as a sentence of its own.
+def iter_sentences(page_texts, max_carry=MAX_CARRY_CHARS):
+    carry = ""
+    for text in page_texts:
+        sentences = sent_tokenize(carry + text + "\n")
+        if not sentences:
+            continue
+        carry = sentences.pop() + "\n"
+        yield from sentences
+        if len(carry) > max_carry:
+            yield carry.strip()
+            carry = ""
+    if carry.strip():
+        yield carry.strip()
+
+
+def iter_chunks(sentences, max_sentences_per_chunk=CHUNK_SENTENCES):
+    chunk = []
+    for sentence in sentences:
+        chunk.append(sentence)
+        if len(chunk) == max_sentences_per_chunk:
+            yield " ".join(chunk)
+            chunk = []
+    if chunk:
+        yield " ".join(chunk)
+
+
+# page -> sentence -> chunk pipeline over one PDF. Pages are only extracted as chunks are
+# consumed, so stopping early skips the rest of the document; pages_processed says how far it got.
+# workers=None picks serial or parallel extraction from the page count; an int forces that many.
+class PdfChunkStream():
+    def __init__(self, file_path: str, max_sentences_per_chunk: int = CHUNK_SENTENCES, workers: int = None):
+        self.file_path = file_path
+        self.max_sentences_per_chunk = max_sentences_per_chunk
+        self.workers = workers
+        self.pages_processed = 0
+        self.total_pages = None
+        self.workers_used = None
+
+    def _page_texts(self):
+        with open(self.file_path, 'rb') as pdf_file:
+            reader = PyPDF2.PdfReader(pdf_file)
+            self.total_pages = len(reader.pages)
+            self.workers_used = choose_workers(self.total_pages, self.workers)
+            if self.workers_used == 1:
+                for page_number, text in iter_pages(reader):
+                    self.pages_processed = page_number + 1
+                    yield text
+                return
+
+        for page_number, text in iter_pages_parallel(self.file_path, self.total_pages, self.workers_used):
+            self.pages_processed = page_number + 1
+            yield text
+
+    def __iter__(self):
+        return iter_chunks(iter_sentences(self._page_texts()), self.max_sentences_per_chunk)
+
+    # First `limit` chunks (all of them when limit is None)
+    def take(self, limit=None) -> list:
+        chunks = []
+        if limit is not None and limit <= 0:
+            return chunks
+        for chunk in self:
+            chunks.append(chunk)
+            if limit is not None and len(chunks) >= limit:
+                break
+        return chunks
+
+    # Counts chunks without holding them
+    def count(self) -> int:
+        return sum(1 for _ in self)
+
+    def stats(self) -> dict:
+        return {"pages_processed": self.pages_processed, "total_pages": self.total_pages, "workers": self.workers_used}
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Stream chunks out of a PDF")
+    parser.add_argument('--file', required=True, help="PDF to read")
+    parser.add_argument('--limit', type=int, default=None, help="Stop after this many chunks")
+    parser.add_argument('--workers', type=int, default=None, help="Extraction processes (default: by page count)")
+
+    args = parser.parse_args()
+    stream = PdfChunkStream(args.file, workers=args.workers)
+    chunks = stream.take(args.limit)
+    print(json.dumps({"chunks": len(chunks), **stream.stats()}, indent=2))
@@ -0,0 +1,51 @@
+import argparse
+import json
+import os
+import urllib.error
+import urllib.request
+
+DEFAULT_URL = os.environ.get('QG_SERVER_URL', 'http://127.0.0.1:5002')
+
+
+# Drop-in replacement for `python3 main.py ...` that talks to a warm `main.py --serve` process.
+def request_questions(url, params, timeout=600):
+    data = json.dumps(params).encode('utf-8')
+    req = urllib.request.Request(
+        url.rstrip('/') + '/generate-questions',
+        data=data,
+        headers={'Content-Type': 'application/json'},
+        method='POST'
+    )
+    try:
+        with urllib.request.urlopen(req, timeout=timeout) as response:
+            return json.loads(response.read())
+    except urllib.error.HTTPError as e:
+        return json.loads(e.read() or b'{}') or {"error": f"HTTP {e.code}"}
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Generate questions via a running question generation server")
+    parser.add_argument('--url', default=DEFAULT_URL, help="Base URL of the question generation server")
+    parser.add_argument('--topic', help="Topic name")
+    parser.add_argument('--subTopic', help="Sub-topic name")
+    parser.add_argument('--questionType', required=True, help="Type of questions to generate")
+    parser.add_argument('--numQuestions', type=int, required=True, help="Number of questions to generate")
+    parser.add_argument('--file', help="Path to the uploaded file", default=None)
+    parser.add_argument('--profile', help="Decoding profile", default=None)
+    parser.add_argument('--distractors', help="MCQ distractor source (xai or local)", default=None)
+
+    args = parser.parse_args()
+    params = {
+        "topic": args.topic,
+        "subTopic": args.subTopic,
+        "questionType": args.questionType,
+        "numQuestions": args.numQuestions,
+        "file": os.path.abspath(args.file) if args.file else None,
+        "profile": args.profile,
+        "distractorSource": args.distractors
+    }
+    try:
+        result = request_questions(args.url, params)
+        print(json.dumps(result, indent=2))
+    except Exception as e:
+        print(f"Error occurred: {e}")
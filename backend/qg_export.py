@@ -0,0 +1,151 @@
+import argparse
+import os
+import shutil
+import tempfile
+from contextlib import contextmanager
+
+import torch
+from transformers import T5Config, T5ForConditionalGeneration
+
+MODEL_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'models')
+
+# Artifact location for each exported inference backend
+ARTIFACTS = {
+    "torch": os.path.join(MODEL_DIR, 'qg-t5'),
+    "quantized": os.path.join(MODEL_DIR, 'qg-int8.pt'),
+    "onnx": os.path.join(MODEL_DIR, 'qg-onnx'),
+}
+
+
+def artifact_path(backend):
+    return ARTIFACTS[backend]
+
+
+# Callers treat an existing artifact as complete, so every export is written to a staging
+# path next to its destination and only moved into place once it has been fully written.
+@contextmanager
+def staged_dir(path):
+    parent = os.path.dirname(os.path.abspath(path))
+    os.makedirs(parent, exist_ok=True)
+    staging = tempfile.mkdtemp(dir=parent, prefix=f".{os.path.basename(path)}.")
+    try:
+        yield staging
+        if os.path.isdir(path):
+            shutil.rmtree(path)
+        os.replace(staging, path)
+    finally:
+        shutil.rmtree(staging, ignore_errors=True)
+
+
+# Plain transformers directory (safetensors weights + tokenizer) unpacked from the Lightning
+# checkpoint. Loading it needs neither pytorch_lightning nor the base t5-small weights.
+def export_slim(checkpoint_path, tokenizer, path, base_model='t5-small'):
+    checkpoint = torch.load(checkpoint_path, map_location='cpu', weights_only=False)
+    prefix = 'model.'
+    state_dict = {
+        key[len(prefix):]: value
+        for key, value in checkpoint['state_dict'].items()
+        if key.startswith(prefix)
+    }
+
+    config = T5Config.from_pretrained(base_model)
+    config.vocab_size = state_dict['shared.weight'].shape[0]
+    model = T5ForConditionalGeneration(config)
+    model.load_state_dict(state_dict)
+    export_pretrained(model, tokenizer, path)
+
+
+def export_pretrained(model, tokenizer, path):
+    with staged_dir(path) as staging:
+        model.save_pretrained(staging, safe_serialization=True)
+        tokenizer.save_pretrained(staging)
+
+
+def load_slim(path):
+    model = T5ForConditionalGeneration.from_pretrained(path)
+    model.eval()
+    return model
+
+
+# Dynamic int8 quantization of every Linear layer; weights are stored int8 and
+# activations are quantized on the fly, which suits CPU-only generate().
+def export_quantized(model, path):
+    quantized = torch.quantization.quantize_dynamic(model, {torch.nn.Linear}, dtype=torch.qint8)
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    tmp_path = f"{path}.{os.getpid()}.tmp"
+    try:
+        torch.save(quantized, tmp_path)
+        os.replace(tmp_path, path)
+    finally:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+
+
+def load_quantized(path):
+    model = torch.load(path, weights_only=False)
+    model.eval()
+    return model
+
+
+# ONNX Runtime export goes through optimum, which is optional.
+def _ort_model_class():
+    try:
+        from optimum.onnxruntime import ORTModelForSeq2SeqLM
+    except ImportError:
+        raise RuntimeError("The onnx backend requires optimum[onnxruntime]: pip install optimum[onnxruntime]")
+    return ORTModelForSeq2SeqLM
+
+
+def export_onnx(model, tokenizer, path):
+    ort_model_class = _ort_model_class()
+    with tempfile.TemporaryDirectory() as source:
+        model.save_pretrained(source)
+        tokenizer.save_pretrained(source)
+        ort_model = ort_model_class.from_pretrained(source, export=True)
+        with staged_dir(path) as staging:
+            ort_model.save_pretrained(staging)
+
+
+def load_onnx(path):
+    return _ort_model_class().from_pretrained(path)
+
+
+def export(backend, model, tokenizer, path=None):
+    path = path or artifact_path(backend)
+    if backend == "torch":
+        export_pretrained(model, tokenizer, path)
+    elif backend == "quantized":
+        export_quantized(model, path)
+    elif backend == "onnx":
+        export_onnx(model, tokenizer, path)
+    else:
+        raise ValueError(f"Nothing to export for backend: {backend}")
+    return path
+
+
+def load(backend, path=None):
+    path = path or artifact_path(backend)
+    if backend == "torch":
+        return load_slim(path)
+    if backend == "quantized":
+        return load_quantized(path)
+    if backend == "onnx":
+        return load_onnx(path)
+    raise ValueError(f"No exported artifact for backend: {backend}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Export the fine-tuned checkpoint for an inference backend")
+    parser.add_argument('--backend', choices=list(ARTIFACTS), required=True, help="Backend to export for")
+    parser.add_argument('--output', help="Artifact path (defaults to the backend's location under models/)")
+
+    args = parser.parse_args()
+
+    import main
+    if args.backend == "torch":
+        path = args.output or artifact_path("torch")
+        checkpoint_path = main.hf_hub_download(repo_id=main.CHECKPOINT_REPO_ID, filename="model.ckpt")
+        export_slim(checkpoint_path, main.load_tokenizer(), path, base_model=main.MODEL_NAME)
+    else:
+        path = export(args.backend, main.load_checkpoint_model(), main.load_tokenizer(), args.output)
+    print(f"Exported {args.backend} model to {path}")
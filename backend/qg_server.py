@@ -0,0 +1,275 @@
+import argparse
+import json
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlsplit
+
+import instrumentation
+from job_queue import JobQueue, JobQueueFull
+
+DEFAULT_HOST = '127.0.0.1'
+DEFAULT_PORT = 5002
+JOB_WORKERS = 1  # Jobs share the one warm model, so more workers only queue on generate_lock
+MAX_POLL_WAIT = 30  # Seconds a long poll may block
+
+
+# Long-lived JSON endpoint in front of a warm QuestionGenerator.
+# The handlers are plain callables so the server itself never imports torch:
+#   generate_questions(topic, subTopic, questionType, numQuestions, **options)
+#   generate_questions_from_file(file_path, question_type, num_questions, **options)
+# where options are the optional request fields in REQUEST_OPTIONS, mapped to keyword names,
+# plus progress(completed, total, record) for queued jobs.
+#
+# Besides the blocking POST /generate-questions, generation can run as a queued job:
+#   POST   /jobs                   same body plus optional "priority"; 202 with the job id
+#   GET    /jobs/<id>?since=N      status, progress and questions from index N on; add
+#                                  &version=V&wait=S to block until the job moves past V
+#   GET    /jobs/<id>/events       NDJSON stream of the same snapshots until the job ends
+#   DELETE /jobs/<id>              cancel
+# GET /stats reports the job queue plus whatever `stats` providers the caller registered
+# (e.g. the batch scheduler's latency percentiles). GET /metrics exposes this process's
+# per-stage histograms and counters (instrumentation.py) in the Prometheus text format;
+# with a worker pool the model stages run, and are counted, in the workers.
+# "trace": true in a request body adds that request's stage timings to its result.
+REQUEST_OPTIONS = {'profile': 'profile', 'distractorSource': 'distractor_source', 'trace': 'trace'}
+
+class QuestionRequestHandler(BaseHTTPRequestHandler):
+    server_version = 'quizzllm-qg/1.0'
+
+    def do_GET(self):
+        url = urlsplit(self.path)
+        parts = url.path.strip('/').split('/')
+        if url.path == '/health':
+            self._send_json(200, {"status": "ok"})
+        elif url.path == '/jobs':
+            self._send_json(200, self.server.jobs.stats())
+        elif url.path == '/stats':
+            self._send_json(200, self.server.stats())
+        elif url.path == '/metrics':
+            self._send_metrics()
+        elif parts[0] == 'jobs' and len(parts) == 2:
+            self._poll_job(parts[1], parse_qs(url.query))
+        elif parts[0] == 'jobs' and len(parts) == 3 and parts[2] == 'events':
+            self._stream_job(parts[1], parse_qs(url.query))
+        else:
+            self._send_json(404, {"error": f"Unknown path: {self.path}"})
+
+    def do_POST(self):
+        if self.path not in ('/generate-questions', '/jobs'):
+            self._send_json(404, {"error": f"Unknown path: {self.path}"})
+            return
+
+        try:
+            length = int(self.headers.get('Content-Length', 0))
+            params = json.loads(self.rfile.read(length) or b'{}')
+        except (ValueError, json.JSONDecodeError) as e:
+            self._send_json(400, {"error": f"Invalid JSON body: {e}"})
+            return
+
+        if self.path == '/jobs':
+            self._submit_job(params)
+            return
+
+        try:
+            result = self.server.dispatch(params)
+        except KeyError as e:
+            self._send_json(400, {"error": f"Missing field: {e.args[0]}"})
+            return
+        except (TypeError, ValueError) as e:
+            self._send_json(400, {"error": str(e)})
+            return
+        except Exception as e:
+            self._send_json(500, {"error": f"Error occurred: {e}"})
+            return
+
+        self._send_json(200, result)
+
+    def do_DELETE(self):
+        parts = urlsplit(self.path).path.strip('/').split('/')
+        if parts[0] != 'jobs' or len(parts) != 2:
+            self._send_json(404, {"error": f"Unknown path: {self.path}"})
+        elif self.server.jobs.cancel(parts[1]):
+            self._send_json(200, {"jobId": parts[1], "status": "cancelling"})
+        elif self.server.jobs.get(parts[1]) is None:
+            self._send_json(404, {"error": f"Unknown job: {parts[1]}"})
+        else:
+            self._send_json(409, {"error": f"Job {parts[1]} has already finished"})
+
+    def _submit_job(self, params):
+        try:
+            params['questionType']
+            int(params['numQuestions'])
+            priority = int(params.get('priority') or 0)
+        except KeyError as e:
+            self._send_json(400, {"error": f"Missing field: {e.args[0]}"})
+            return
+        except (TypeError, ValueError) as e:
+            self._send_json(400, {"error": str(e)})
+            return
+
+        try:
+            job = self.server.jobs.submit(params, priority)
+        except JobQueueFull as e:
+            self._send_json(503, {"error": str(e)})
+            return
+        self._send_json(202, job.snapshot())
+
+    def _poll_job(self, job_id, query):
+        job = self.server.jobs.get(job_id)
+        if job is None:
+            self._send_json(404, {"error": f"Unknown job: {job_id}"})
+            return
+        try:
+            since = int(query.get('since', ['0'])[0])
+            wait = min(float(query.get('wait', ['0'])[0]), MAX_POLL_WAIT)
+            version = int(query.get('version', [str(job.version)])[0])
+        except ValueError as e:
+            self._send_json(400, {"error": str(e)})
+            return
+        if wait > 0:
+            self.server.jobs.wait(job, version, wait)
+        self._send_json(200, job.snapshot(since))
+
+    # One JSON line per change until the job finishes; each line carries only new questions
+    def _stream_job(self, job_id, query):
+        job = self.server.jobs.get(job_id)
+        if job is None:
+            self._send_json(404, {"error": f"Unknown job: {job_id}"})
+            return
+        try:
+            since = int(query.get('since', ['0'])[0])
+        except ValueError as e:
+            self._send_json(400, {"error": str(e)})
+            return
+        self.send_response(200)
+        self.send_header('Content-Type', 'application/x-ndjson')
+        self.send_header('Cache-Control', 'no-cache')
+        self.end_headers()
+
+        version = -1
+        try:
+            while True:
+                self.server.jobs.wait(job, version, MAX_POLL_WAIT)
+                snapshot = job.snapshot(since)
+                if snapshot["version"] != version:
+                    self.wfile.write(json.dumps(snapshot).encode('utf-8') + b'\n')
+                    self.wfile.flush()
+                    version, since = snapshot["version"], snapshot["next"]
+                if job.finished and version == job.version:
+                    break
+        except (BrokenPipeError, ConnectionResetError):
+            pass
+
+    def _send_metrics(self):
+        body = instrumentation.render_prometheus().encode('utf-8')
+        self.send_response(200)
+        self.send_header('Content-Type', 'text/plain; version=0.0.4; charset=utf-8')
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def _send_json(self, status, payload):
+        instrumentation.increment("http_responses", status=status)
+        body = json.dumps(payload).encode('utf-8')
+        self.send_response(status)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        # Keep stdout clean; the CLI contract is JSON only.
+        pass
+
+
+class QuestionServer(ThreadingHTTPServer):
+    daemon_threads = True
+
+    def __init__(self, address, generate_questions, generate_questions_from_file, job_workers=JOB_WORKERS,
+                 concurrency=1, stats=None, generate_lock=None):
+        super().__init__(address, QuestionRequestHandler)
+        self.generate_questions = generate_questions
+        self.generate_questions_from_file = generate_questions_from_file
+        # One generation per model instance at a time; concurrency > 1 only with a worker pool
+        # or batch scheduler behind the handlers, since a single torch instance already uses every core.
+        # Pass generate_lock to share the limit with model work outside requests (bank refills).
+        self.generate_lock = generate_lock if generate_lock is not None else threading.BoundedSemaphore(concurrency)
+        self.jobs = JobQueue(self.dispatch, workers=max(job_workers, concurrency))
+        self.stats_providers = stats or {}
+
+    def stats(self) -> dict:
+        return {"jobs": self.jobs.stats(), **{name: provider() for name, provider in self.stats_providers.items()}}
+
+    def dispatch(self, params, progress=None):
+        question_type = params['questionType']
+        num_questions = int(params['numQuestions'])
+        options = {name: params[key] for key, name in REQUEST_OPTIONS.items() if params.get(key) is not None}
+        if progress is not None:
+            options['progress'] = progress
+        with instrumentation.stage("request"), self.generate_lock:
+            if params.get('file'):
+                return self.generate_questions_from_file(params['file'], question_type, num_questions, **options)
+            return self.generate_questions(params.get('topic'), params.get('subTopic'), question_type, num_questions, **options)
+
+
+def make_server(host, port, generate_questions, generate_questions_from_file, concurrency=1, stats=None, generate_lock=None):
+    return QuestionServer((host, port), generate_questions, generate_questions_from_file, concurrency=concurrency, stats=stats,
+                          generate_lock=generate_lock)
+
+
+def serve(host, port, generate_questions, generate_questions_from_file, concurrency=1, stats=None, generate_lock=None):
+    server = make_server(host, port, generate_questions, generate_questions_from_file, concurrency, stats, generate_lock)
+    print(f"Question generation server listening on http://{host}:{server.server_port}", flush=True)
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.jobs.close()
+        server.server_close()
+
+
+# Stand-in handlers used to exercise the wire protocol without loading the model.
+STUB_DELAY = 0.1  # Seconds per stub question, so job progress is observable
+
+
+def _stub_questions(records, progress=None, **options):
+    for i, record in enumerate(records):
+        if progress is not None:
+            time.sleep(STUB_DELAY)
+            progress(i + 1, len(records), record)
+    return {"questions": records}
+
+
+def stub_generate_questions(topic, subTopic, questionType, numQuestions, **options):
+    return _stub_questions([
+        {
+            "questionType": questionType,
+            "question": f"Stub question {i + 1} about {subTopic}?",
+            "answer": f"Stub answer {i + 1}",
+            "context": f"{topic} / {subTopic}"
+        }
+        for i in range(numQuestions)
+    ], **options)
+
+
+def stub_generate_questions_from_file(file_path, question_type, num_questions, **options):
+    return _stub_questions([
+        {
+            "questionType": question_type,
+            "question": f"Stub question {i + 1} from {file_path}?",
+            "answer": f"Stub answer {i + 1}",
+            "context": file_path
+        }
+        for i in range(num_questions)
+    ], **options)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Run a stand-in question generation server (no model)")
+    parser.add_argument('--host', default=DEFAULT_HOST, help="Interface to bind")
+    parser.add_argument('--port', type=int, default=DEFAULT_PORT, help="Port to listen on")
+
+    args = parser.parse_args()
+    serve(args.host, args.port, stub_generate_questions, stub_generate_questions_from_file)
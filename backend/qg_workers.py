@@ -0,0 +1,225 @@
+import builtins
+import itertools
+import multiprocessing
+import os
+import queue
+import sys
+import threading
+from concurrent.futures import Future
+
+POLL_INTERVAL = 1.0  # Seconds between liveness checks while waiting for results
+
+
+def available_cores():
+    try:
+        return sorted(os.sched_getaffinity(0))
+    except AttributeError:
+        return list(range(os.cpu_count() or 1))
+
+
+# Cores for each worker: consecutive blocks of `threads` cores, wrapping when there are
+# more threads in total than cores
+def plan_affinity(workers, threads, cores=None):
+    cores = cores if cores is not None else available_cores()
+    return [
+        sorted({cores[(index * threads + offset) % len(cores)] for offset in range(threads)})
+        for index in range(workers)
+    ]
+
+
+def default_threads(workers):
+    return max(1, len(available_cores()) // workers)
+
+
+def _configure_threads(threads, cores):
+    if cores:
+        os.sched_setaffinity(0, cores)
+    import torch
+    torch.set_num_threads(threads)
+    try:
+        torch.set_num_interop_threads(1)
+    except RuntimeError:
+        pass  # Already fixed for this process
+
+
+# Rebuild an exception from a worker in the parent, keeping its builtin type where there is
+# one so callers can tell bad requests (ValueError, KeyError, ...) from failures
+def _rebuild_error(type_name, message):
+    error_type = getattr(builtins, type_name, None)
+    if isinstance(error_type, type) and issubclass(error_type, Exception):
+        return error_type(message)
+    return RuntimeError(f"{type_name}: {message}")
+
+
+def _worker_main(index, handlers, tasks, results, threads, cores, init_worker):
+    _configure_threads(threads, cores)
+    if init_worker is not None:
+        init_worker(index)
+    results.put(("ready", index, None))
+
+    while True:
+        task = tasks.get()
+        if task is None:
+            return
+        task_id, name, args, kwargs, report_progress = task
+        if report_progress:
+            kwargs["progress"] = lambda completed, total, record: results.put(
+                ("progress", task_id, (completed, total, record)))
+        try:
+            value = handlers[name](*args, **kwargs)
+        except Exception as e:
+            message = e.args[0] if isinstance(e, KeyError) and e.args else str(e)
+            results.put(("error", task_id, (type(e).__name__, message)))
+        else:
+            results.put(("result", task_id, value))
+
+
+# N forked model processes behind a least-loaded dispatcher. Whatever the parent has loaded
+# before start() (the model weights) is shared copy-on-write with every worker; each worker
+# runs `threads` intra-op threads, optionally pinned to its own block of cores.
+# handlers maps names to module-level callables; they run inside the workers.
+class WorkerPool():
+    def __init__(self, handlers: dict, workers: int = 2, threads: int = None, pin_cores: bool = False,
+                 init_worker=None):
+        self.handlers = handlers
+        self.workers = workers
+        self.threads = threads or default_threads(workers)
+        self.affinity = plan_affinity(workers, self.threads) if pin_cores else [None] * workers
+        self.init_worker = init_worker
+        self._context = multiprocessing.get_context('fork')
+        self._results = self._context.Queue()
+        self._task_queues = []
+        self._processes = []
+        self._in_flight = []  # Task ids per worker
+        self._futures = {}
+        self._progress = {}
+        self._task_ids = itertools.count()
+        self._lock = threading.Lock()
+        self._ready = threading.Semaphore(0)
+        self._closed = False
+        self._collector = None
+
+    def start(self, wait: bool = True):
+        # The Rust tokenizer's thread pool does not survive fork(); tokenizing is a tiny
+        # share of a request, so workers (and the parent from here on) do it serially
+        os.environ.setdefault('TOKENIZERS_PARALLELISM', 'false')
+        for index in range(self.workers):
+            tasks = self._context.Queue()
+            process = self._context.Process(
+                target=_worker_main,
+                args=(index, self.handlers, tasks, self._results, self.threads, self.affinity[index], self.init_worker),
+                name=f'qg-worker-{index}',
+                daemon=True
+            )
+            process.start()
+            self._task_queues.append(tasks)
+            self._processes.append(process)
+            self._in_flight.append(set())
+        self._collector = threading.Thread(target=self._collect, name='qg-worker-results', daemon=True)
+        self._collector.start()
+        if wait:
+            ready = 0
+            while ready < self.workers:
+                if self._ready.acquire(timeout=POLL_INTERVAL):
+                    ready += 1
+                elif not all(process.is_alive() for process in self._processes):
+                    self.close()
+                    raise RuntimeError("A model worker exited during start-up")
+        return self
+
+    # Queue a call on the least busy live worker; the Future resolves to its return value.
+    # progress(completed, total, record) is relayed from the worker when given.
+    def submit(self, name: str, *args, progress=None, **kwargs) -> Future:
+        future = Future()
+        with self._lock:
+            live = [index for index, process in enumerate(self._processes) if process.is_alive()]
+            if self._closed or not live:
+                raise RuntimeError("No model workers are running")
+            index = min(live, key=lambda i: len(self._in_flight[i]))
+            task_id = next(self._task_ids)
+            self._in_flight[index].add(task_id)
+            self._futures[task_id] = (index, future)
+            if progress is not None:
+                self._progress[task_id] = progress
+        self._task_queues[index].put((task_id, name, args, kwargs, progress is not None))
+        return future
+
+    # Blocking callable with the handler's signature, for qg_server
+    def handler(self, name: str):
+        def call(*args, progress=None, **kwargs):
+            return self.submit(name, *args, progress=progress, **kwargs).result()
+        return call
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                "workers": self.workers,
+                "pids": [process.pid for process in self._processes],
+                "threads_per_worker": self.threads,
+                "affinity": self.affinity,
+                "alive": [process.is_alive() for process in self._processes],
+                "in_flight": [len(tasks) for tasks in self._in_flight]
+            }
+
+    def close(self):
+        with self._lock:
+            self._closed = True
+        for tasks in self._task_queues:
+            tasks.put(None)
+        for process in self._processes:
+            process.join(timeout=5)
+            if process.is_alive():
+                process.terminate()
+
+    def _collect(self):
+        while True:
+            try:
+                kind, key, payload = self._results.get(timeout=POLL_INTERVAL)
+            except queue.Empty:
+                self._fail_dead_workers()
+                if self._closed:
+                    return
+                continue
+
+            if kind == "ready":
+                self._ready.release()
+                continue
+            if kind == "progress":
+                callback = self._progress.get(key)
+                if callback is not None:
+                    try:
+                        callback(*payload)
+                    except Exception as e:
+                        # e.g. a cancelled job: fail the caller now, but the worker stays busy
+                        # (and counted as in flight) until the task itself returns
+                        with self._lock:
+                            self._progress.pop(key, None)
+                            _, future = self._futures.get(key, (None, None))
+                        if future is not None and not future.done():
+                            future.set_exception(e)
+                continue
+            if kind == "error":
+                self._resolve(key, error=_rebuild_error(*payload))
+            else:
+                self._resolve(key, value=payload)
+
+    def _resolve(self, task_id, value=None, error=None):
+        with self._lock:
+            index, future = self._futures.pop(task_id, (None, None))
+            self._progress.pop(task_id, None)
+            if index is not None:
+                self._in_flight[index].discard(task_id)
+        if future is None or future.done():
+            return
+        if error is not None:
+            future.set_exception(error)
+        else:
+            future.set_result(value)
+
+    def _fail_dead_workers(self):
+        for index, process in enumerate(self._processes):
+            if process.is_alive() or not self._in_flight[index]:
+                continue
+            print(f"Model worker {index} exited with code {process.exitcode}", file=sys.stderr)
+            for task_id in list(self._in_flight[index]):
+                self._resolve(task_id, error=RuntimeError(f"Model worker {index} exited"))
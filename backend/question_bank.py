@@ -0,0 +1,192 @@
+import argparse
+import contextlib
+import json
+import os
+import random
+import sqlite3
+import sys
+import threading
+import time
+
+from paths import CACHE_ROOT
+
+BANK_PATH = os.path.join(CACHE_ROOT, 'question_bank.sqlite3')
+TARGET_LEVEL = 30  # Questions a pool is filled up to
+LOW_WATERMARK = 10  # A pool below this is refilled in the background
+FILL_STEP = 10  # Most questions generated per refill call, so requests are not held up for long
+CHECK_INTERVAL = 60.0  # Seconds between refiller sweeps when nothing asks for one
+
+
+def pool_key(topic, subtopic, question_type):
+    return json.dumps([topic, subtopic, question_type])
+
+
+# Finished question records stocked per (topic, sub-topic, question type) pool, each with the
+# chunk it came from. Records are stored in random order and served first-in first-out, each
+# at most once, so taking n questions is one indexed range read and delete, however large the
+# bank grows.
+class QuestionBank():
+    def __init__(self, path: str = BANK_PATH):
+        self.path = path
+        self.served = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+
+        if path != ':memory:':
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+        self._db = sqlite3.connect(path, check_same_thread=False, timeout=30)
+        self._db.execute('PRAGMA journal_mode=WAL')
+        self._db.execute('CREATE TABLE IF NOT EXISTS bank (id INTEGER PRIMARY KEY AUTOINCREMENT, pool TEXT NOT NULL, '
+                         'record TEXT NOT NULL, chunk TEXT NOT NULL, created_at REAL NOT NULL)')
+        self._db.execute('CREATE INDEX IF NOT EXISTS bank_pool ON bank (pool, id)')
+        self._db.commit()
+
+    # entries: (record, chunk text)
+    def put(self, topic, subtopic, question_type, entries):
+        if not entries:
+            return
+        entries = list(entries)
+        random.shuffle(entries)
+        now = time.time()
+        key = pool_key(topic, subtopic, question_type)
+        with self._lock:
+            self._db.executemany('INSERT INTO bank (pool, record, chunk, created_at) VALUES (?, ?, ?, ?)',
+                                 [(key, json.dumps(record), chunk, now) for record, chunk in entries])
+            self._db.commit()
+
+    # n (record, chunk) entries from the pool, removed from stock; None (and nothing removed)
+    # when it has fewer
+    def take(self, topic, subtopic, question_type, n):
+        key = pool_key(topic, subtopic, question_type)
+        with self._lock:
+            rows = self._db.execute('SELECT id, record, chunk FROM bank WHERE pool = ? ORDER BY id LIMIT ?', (key, n)).fetchall()
+            if len(rows) < n:
+                self.misses += 1
+                return None
+            self._db.execute(f"DELETE FROM bank WHERE id IN ({','.join('?' * len(rows))})", [row[0] for row in rows])
+            self._db.commit()
+            self.served += n
+        return [(json.loads(record), chunk) for _, record, chunk in rows]
+
+    # Every record in stock for a pool, without removing them (e.g. to avoid restocking duplicates)
+    def records(self, topic, subtopic, question_type):
+        with self._lock:
+            rows = self._db.execute('SELECT record FROM bank WHERE pool = ? ORDER BY id',
+                                    (pool_key(topic, subtopic, question_type),)).fetchall()
+        return [json.loads(record) for (record,) in rows]
+
+    def level(self, topic, subtopic, question_type):
+        with self._lock:
+            (count,) = self._db.execute('SELECT COUNT(*) FROM bank WHERE pool = ?',
+                                        (pool_key(topic, subtopic, question_type),)).fetchone()
+        return count
+
+    # {(topic, sub-topic, question type): questions in stock}
+    def levels(self) -> dict:
+        with self._lock:
+            rows = self._db.execute('SELECT pool, COUNT(*) FROM bank GROUP BY pool').fetchall()
+        return {tuple(json.loads(key)): count for key, count in rows}
+
+    def stats(self) -> dict:
+        levels = self.levels()
+        return {
+            "pools": len(levels),
+            "questions": sum(levels.values()),
+            "lowest": min(levels.values()) if levels else 0,
+            "served": self.served,
+            "misses": self.misses
+        }
+
+    def clear(self):
+        with self._lock:
+            self._db.execute('DELETE FROM bank')
+            self._db.commit()
+
+    def close(self):
+        self._db.close()
+
+
+# Background thread that tops pools up to `level` once they drop below `low_watermark`.
+# fill(topic, subtopic, question_type, count) generates and stores up to count questions.
+# It looks after the pools given up front plus every pool passed to notify(), which callers
+# use after each request so a sweep runs without waiting for the interval. Each fill call
+# holds `lock`, the server's generate_lock, so refills and requests take turns on the model.
+class BankRefiller():
+    def __init__(self, bank: QuestionBank, fill, pools=(), low_watermark: int = LOW_WATERMARK,
+                 level: int = TARGET_LEVEL, interval: float = CHECK_INTERVAL, lock=None):
+        self.bank = bank
+        self.fill = fill
+        self.lock = lock if lock is not None else contextlib.nullcontext()
+        self.pools = set(pools)
+        self.low_watermark = low_watermark
+        self.level = level
+        self.interval = interval
+        self.refills = 0
+        self.failures = 0
+        self._wake = threading.Event()
+        self._closed = False
+        self._thread = threading.Thread(target=self._run, name='question-bank-refill', daemon=True)
+
+    def start(self):
+        self._thread.start()
+        return self
+
+    def notify(self, pool=None):
+        if pool is not None:
+            self.pools.add(tuple(pool))
+        self._wake.set()
+
+    def close(self):
+        self._closed = True
+        self._wake.set()
+        if self._thread.is_alive():
+            self._thread.join()
+
+    def stats(self) -> dict:
+        return {**self.bank.stats(), "refills": self.refills, "failures": self.failures, "watched": len(self.pools),
+                "low_watermark": self.low_watermark, "level": self.level}
+
+    def _run(self):
+        while not self._closed:
+            self._wake.clear()
+            self.sweep()
+            self._wake.wait(self.interval)
+
+    # Emptiest pools first, FILL_STEP questions per call so a refill never holds the model for
+    # long; returns {pool: questions added}
+    def sweep(self) -> dict:
+        levels = self.bank.levels()
+        low = sorted((levels.get(pool, 0), pool) for pool in list(self.pools) if levels.get(pool, 0) < self.low_watermark)
+        added = {}
+        for count, pool in low:
+            added[pool] = 0
+            while count < self.level and not self._closed:
+                try:
+                    with self.lock:
+                        step = self.fill(*pool, min(FILL_STEP, self.level - count))
+                except Exception as e:
+                    print(f"Question bank refill failed for {pool}: {e}", file=sys.stderr)
+                    self.failures += 1
+                    break
+                self.refills += 1
+                if not step:
+                    break  # The source has nothing more to give
+                count += step
+                added[pool] += step
+        return added
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Inspect or clear the pre-generated question bank (fill it with main.py --fillBank)")
+    parser.add_argument('--path', default=BANK_PATH, help="Bank database")
+    parser.add_argument('--clear', action='store_true', help="Remove every stocked question")
+    parser.add_argument('--levels', action='store_true', help="List the stock of every pool")
+
+    args = parser.parse_args()
+    bank = QuestionBank(args.path)
+    if args.clear:
+        bank.clear()
+    result = bank.stats()
+    if args.levels:
+        result["levels"] = [{"topic": t, "subTopic": s, "questionType": q, "questions": n} for (t, s, q), n in sorted(bank.levels().items())]
+    print(json.dumps(result, indent=2))
@@ -0,0 +1,116 @@
+import argparse
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import time
+
+from paths import CACHE_ROOT
+
+CACHE_PATH = os.path.join(CACHE_ROOT, 'questions.sqlite3')
+MAX_ENTRIES = 50000  # Least recently used outputs are evicted above this
+
+
+# Everything that can change the model output for a chunk goes into the key.
+def make_key(context, question_type, model_id, decoding):
+    material = json.dumps([context, question_type, model_id, decoding], sort_keys=True)
+    return hashlib.sha256(material.encode('utf-8')).hexdigest()
+
+
+# Raw generate() outputs keyed by make_key, with LRU eviction and hit/miss counters.
+class QuestionCache():
+    def __init__(self, path: str = CACHE_PATH, max_entries: int = MAX_ENTRIES):
+        self.path = path
+        self.max_entries = max_entries
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+
+        if path != ':memory:':
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+        self._db = sqlite3.connect(path, check_same_thread=False, timeout=30)
+        self._db.execute('PRAGMA journal_mode=WAL')
+        self._db.execute('CREATE TABLE IF NOT EXISTS questions (key TEXT PRIMARY KEY, output TEXT NOT NULL, last_access REAL NOT NULL)')
+        self._db.execute('CREATE INDEX IF NOT EXISTS questions_last_access ON questions (last_access)')
+        self._db.execute('CREATE TABLE IF NOT EXISTS counters (name TEXT PRIMARY KEY, value INTEGER NOT NULL)')
+        self._db.commit()
+
+    def get_many(self, keys: list) -> dict:
+        if not keys:
+            return {}
+        unique_keys = list(dict.fromkeys(keys))
+        found = {}
+        with self._lock:
+            for start in range(0, len(unique_keys), 500):  # Stay under SQLite's bound-variable limit
+                batch = unique_keys[start:start + 500]
+                placeholders = ','.join('?' * len(batch))
+                rows = self._db.execute(f'SELECT key, output FROM questions WHERE key IN ({placeholders})', batch)
+                found.update(rows.fetchall())
+            now = time.time()
+            self._db.executemany('UPDATE questions SET last_access = ? WHERE key = ?', [(now, key) for key in found])
+            hits = sum(1 for key in keys if key in found)
+            self._count(hits, len(keys) - hits)
+            self._db.commit()
+        return found
+
+    def put_many(self, items: dict):
+        if not items:
+            return
+        now = time.time()
+        with self._lock:
+            self._db.executemany(
+                'INSERT OR REPLACE INTO questions (key, output, last_access) VALUES (?, ?, ?)',
+                [(key, output, now) for key, output in items.items()]
+            )
+            self._evict()
+            self._db.commit()
+
+    def _evict(self):
+        (count,) = self._db.execute('SELECT COUNT(*) FROM questions').fetchone()
+        if count > self.max_entries:
+            self._db.execute(
+                'DELETE FROM questions WHERE key IN (SELECT key FROM questions ORDER BY last_access LIMIT ?)',
+                (count - self.max_entries,)
+            )
+
+    def _count(self, hits, misses):
+        self.hits += hits
+        self.misses += misses
+        self._db.executemany(
+            'INSERT INTO counters (name, value) VALUES (?, ?) ON CONFLICT(name) DO UPDATE SET value = value + excluded.value',
+            [('hits', hits), ('misses', misses)]
+        )
+
+    def stats(self) -> dict:
+        with self._lock:
+            (entries,) = self._db.execute('SELECT COUNT(*) FROM questions').fetchone()
+            totals = dict(self._db.execute('SELECT name, value FROM counters').fetchall())
+        return {
+            "entries": entries,
+            "hits": self.hits,
+            "misses": self.misses,
+            "lifetime_hits": totals.get('hits', 0),
+            "lifetime_misses": totals.get('misses', 0)
+        }
+
+    def clear(self):
+        with self._lock:
+            self._db.execute('DELETE FROM questions')
+            self._db.execute('DELETE FROM counters')
+            self._db.commit()
+
+    def close(self):
+        self._db.close()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Inspect or clear the generated-question cache")
+    parser.add_argument('--path', default=CACHE_PATH, help="Cache database")
+    parser.add_argument('--clear', action='store_true', help="Remove every cached output")
+
+    args = parser.parse_args()
+    cache = QuestionCache(args.path)
+    if args.clear:
+        cache.clear()
+    print(json.dumps(cache.stats(), indent=2))
@@ -0,0 +1,229 @@
+import argparse
+import functools
+import hashlib
+import json
+import os
+import re
+import sqlite3
+import threading
+import time
+
+import numpy as np
+
+from text_features import STOPWORDS, feature_hash
+from paths import CACHE_ROOT
+
+HISTORY_PATH = os.path.join(CACHE_ROOT, 'question_history.sqlite3')
+HASH_DIM = 1 << 10  # Hashed content-word unigrams and bigrams of the question, words of the answer
+SIMILARITY_THRESHOLD = 0.8  # Cosine similarity at which two questions count as the same one
+MAX_HISTORY = 300  # Questions remembered per subtopic; the oldest are forgotten first
+
+_WORD_RE = re.compile(r"[a-z0-9][a-z0-9+#'\-]*")
+
+_history_enabled = os.environ.get('QUIZZLLM_DEDUP_HISTORY', '1') not in ('', '0')
+_indexes = {}
+_indexes_lock = threading.Lock()
+
+
+# Questions served before still count within one request; across requests only while enabled
+def set_history_enabled(enabled):
+    global _history_enabled
+    _history_enabled = enabled
+
+
+def chunk_hash(chunk):
+    return hashlib.sha1(chunk.encode('utf-8')).hexdigest()[:16]
+
+
+# Question templates ("What is the role of ... in ...") are shared by unrelated questions,
+# so only content words count
+def _features(question, answer):
+    words = [word for word in _WORD_RE.findall(question.lower()) if word not in STOPWORDS]
+    features = words + [f"{a} {b}" for a, b in zip(words, words[1:])]
+    return features + [f"answer:{word}" for word in _WORD_RE.findall((answer or "").lower())]
+
+
+# L2-normalized hashed feature rows, one per (question, answer)
+def question_vectors(pairs):
+    vectors = np.zeros((len(pairs), HASH_DIM), dtype=np.float32)
+    for row, (question, answer) in enumerate(pairs):
+        for feature in _features(question, answer):
+            vectors[row, feature_hash(feature, HASH_DIM)] += 1
+    norms = np.linalg.norm(vectors, axis=1, keepdims=True)
+    return vectors / np.where(norms == 0, 1, norms)
+
+
+# One candidate's row; a candidate is checked, then accepted, with the same vector
+@functools.lru_cache(maxsize=1024)
+def question_vector(question, answer):
+    vector = question_vectors([(question, answer)])[0]
+    vector.setflags(write=False)
+    return vector
+
+
+def _connect(path):
+    if path != ':memory:':
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+    db = sqlite3.connect(path, check_same_thread=False, timeout=30)
+    db.execute('PRAGMA journal_mode=WAL')
+    db.execute('CREATE TABLE IF NOT EXISTS history (id INTEGER PRIMARY KEY AUTOINCREMENT, key TEXT NOT NULL, '
+               'question TEXT NOT NULL, answer TEXT NOT NULL, chunk TEXT NOT NULL, added_at REAL NOT NULL)')
+    db.execute('CREATE INDEX IF NOT EXISTS history_key ON history (key, id)')
+    db.commit()
+    return db
+
+
+# Questions already served for one subtopic (or upload). The history lives in SQLite, shared
+# by every process (--serve, forked workers, CLI runs); each process holds the newest
+# max_history entries of a key as one matrix, so checking a candidate is a single
+# matrix-vector product, and refresh() reads only the rows added since it last looked.
+class QuestionIndex():
+    def __init__(self, key: str, path: str = HISTORY_PATH, max_history: int = MAX_HISTORY):
+        self.key = key
+        self.path = path
+        self.max_history = max_history
+        self.entries = []  # {"question", "answer", "chunk", "added_at"}, oldest first
+        self.vectors = np.zeros((0, HASH_DIM), dtype=np.float32)
+        self.last_id = 0
+        self._lock = threading.Lock()
+        self._db = None
+        self._pid = None
+
+    # Connections must not cross fork(), so a forked worker opens its own
+    def _connection(self):
+        if self._db is None or self._pid != os.getpid():
+            self._db, self._pid = _connect(self.path), os.getpid()
+        return self._db
+
+    def load(self):
+        return self.refresh()
+
+    def refresh(self):
+        with self._lock:
+            rows = self._connection().execute(
+                'SELECT id, question, answer, chunk, added_at FROM history WHERE key = ? AND id > ? ORDER BY id',
+                (self.key, self.last_id)).fetchall()
+            if not rows:
+                return self
+            rows = rows[-self.max_history:]
+            entries = [{"question": q, "answer": a, "chunk": chunk, "added_at": added_at} for _, q, a, chunk, added_at in rows]
+            vectors = question_vectors([(q, a) for _, q, a, _, _ in rows])
+            self.entries = (self.entries + entries)[-self.max_history:]
+            self.vectors = np.vstack([self.vectors, vectors])[-self.max_history:]
+            self.last_id = rows[-1][0]
+        return self
+
+    # Highest similarity of a candidate row to anything in the index
+    def max_similarity(self, vector):
+        with self._lock:
+            if not len(self.vectors):
+                return 0.0
+            return float((self.vectors @ vector).max())
+
+    def seen_chunks(self) -> set:
+        with self._lock:
+            return {entry['chunk'] for entry in self.entries}
+
+    # records: (question, answer, chunk text). Rows beyond max_history for the key are dropped.
+    def add(self, records):
+        if not records:
+            return
+        now = time.time()
+        with self._lock:
+            db = self._connection()
+            db.executemany('INSERT INTO history (key, question, answer, chunk, added_at) VALUES (?, ?, ?, ?, ?)',
+                           [(self.key, q, a, chunk_hash(chunk), now) for q, a, chunk in records])
+            db.execute('DELETE FROM history WHERE key = ? AND id NOT IN '
+                       '(SELECT id FROM history WHERE key = ? ORDER BY id DESC LIMIT ?)',
+                       (self.key, self.key, self.max_history))
+            db.commit()
+        self.refresh()
+
+    def clear(self):
+        with self._lock:
+            db = self._connection()
+            db.execute('DELETE FROM history WHERE key = ?', (self.key,))
+            db.commit()
+            self.entries = []
+            self.vectors = np.zeros((0, HASH_DIM), dtype=np.float32)
+
+
+# Shared per-process index for a subtopic key, brought up to date with what other processes
+# served; None when history is disabled
+def get_index(key, path=HISTORY_PATH):
+    if not _history_enabled:
+        return None
+    with _indexes_lock:
+        index = _indexes.get((key, path))
+        if index is None:
+            index = _indexes[(key, path)] = QuestionIndex(key, path)
+    return index.refresh()
+
+
+# One request's filter. Candidates are compared with the questions it already accepted and,
+# given an index, with the questions served for the subtopic before:
+#   "new"        keep it
+#   "duplicate"  near-copy of a question in this request; drop it
+#   "repeat"     served in an earlier quiz; use it only if nothing fresh is left
+# With record=False the history is only read and commit() just collects the records in
+# .pending, e.g. when stocking questions that are not served yet.
+class RequestDeduplicator():
+    def __init__(self, index: QuestionIndex = None, threshold: float = SIMILARITY_THRESHOLD, record: bool = True):
+        self.index = index
+        self.threshold = threshold
+        self.record = record
+        self.pending = []
+        self._accepted = np.zeros((16, HASH_DIM), dtype=np.float32)  # Grown by doubling; rows [:size] are used
+        self.size = 0
+        self.counts = {"new": 0, "duplicate": 0, "repeat": 0}
+
+    @property
+    def accepted(self):
+        return self._accepted[:self.size]
+
+    def is_duplicate(self, question, answer):
+        if not self.size:
+            return False
+        return float((self.accepted @ question_vector(question, answer)).max()) >= self.threshold
+
+    def is_repeat(self, question, answer):
+        if self.index is None:
+            return False
+        return self.index.max_similarity(question_vector(question, answer)) >= self.threshold
+
+    def check(self, question, answer):
+        if self.is_duplicate(question, answer):
+            status = "duplicate"
+        elif self.is_repeat(question, answer):
+            status = "repeat"
+        else:
+            status = "new"
+        self.counts[status] += 1
+        return status
+
+    # Called for every question the request returns, including repeats used to fill it up
+    def accept(self, question, answer):
+        if self.size == len(self._accepted):
+            self._accepted = np.vstack([self._accepted, np.zeros_like(self._accepted)])
+        self._accepted[self.size] = question_vector(question, answer)
+        self.size += 1
+
+    # Remember what the request served; records are (question, answer, chunk text)
+    def commit(self, records):
+        if not self.record:
+            self.pending.extend(records)
+        elif self.index is not None and records:
+            self.index.add(records)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Inspect or reset the per-subtopic question history")
+    parser.add_argument('--key', required=True, help="Index key, e.g. 'topic:OS/Threads'")
+    parser.add_argument('--clear', action='store_true', help="Forget every question served for the key")
+
+    args = parser.parse_args()
+    index = QuestionIndex(args.key).load()
+    if args.clear:
+        index.clear()
+    print(json.dumps({"key": args.key, "questions": len(index.entries),
+                      "chunks": len(index.seen_chunks())}, indent=2))
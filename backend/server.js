@@ -261,10 +261,11 @@ const express = require("express");
 const mongoose = require("mongoose");
 const bodyParser = require("body-parser");
 const cors = require("cors");
-const { exec } = require("child_process");
+const { exec, execFile, spawn } = require("child_process");
 const multer = require("multer");
 const path = require('path');
 const fs = require('fs');
+const { Readable } = require("stream");
 require("dotenv").config({ path: path.join(__dirname, "../.env") });
 
 
@@ -278,6 +279,194 @@ app.use(bodyParser.json());
 // Configure Multer for file uploads
 const upload = multer({ dest: "uploads/" });
 
+// main.py's DISTRACTOR_SOURCES; anything else is refused before it reaches main.py
+const DISTRACTOR_SOURCES = ["xai", "local"];
+const invalidDistractorSource = (params) =>
+  params.distractorSource && !DISTRACTOR_SOURCES.includes(params.distractorSource)
+    ? `Invalid distractor source: ${params.distractorSource}. Choose from ${DISTRACTOR_SOURCES.join(", ")}.`
+    : null;
+
+// Question generation: use the warm `python3 main.py --serve` worker when
+// QG_SERVER_URL is set, otherwise spawn main.py for every request.
+const runQuestionGenerator = (params, callback) => {
+  const invalid = invalidDistractorSource(params);
+  if (invalid) {
+    return callback(new Error(invalid));
+  }
+  if (process.env.QG_SERVER_URL) {
+    fetch(`${process.env.QG_SERVER_URL}/generate-questions`, {
+      method: "POST",
+      headers: { "Content-Type": "application/json" },
+      body: JSON.stringify(params),
+    })
+      .then(async (response) => {
+        const result = await response.json();
+        if (!response.ok) {
+          return callback(new Error(result.error || `HTTP ${response.status}`));
+        }
+        callback(null, result);
+      })
+      .catch((err) => callback(err));
+    return;
+  }
+
+  // Arguments go to python3 as a list, never through a shell, like streamQuestionGenerator's
+  const args = params.file
+    ? ["main.py", "--file", params.file]
+    : ["main.py", "--topic", params.topic, "--subTopic", params.subTopic];
+  args.push("--questionType", params.questionType, "--numQuestions", String(params.numQuestions));
+  if (params.profile) {
+    args.push("--profile", params.profile);
+  }
+  if (params.distractorSource) {
+    args.push("--distractors", params.distractorSource);
+  }
+  console.log("Running command:", ["python3", ...args].join(" "));
+
+  execFile("python3", args, (error, stdout, stderr) => {
+    if (error) {
+      return callback(new Error(stderr));
+    }
+    try {
+      callback(null, JSON.parse(stdout));
+    } catch (e) {
+      callback(e);
+    }
+  });
+};
+
+// Calls onLine with each complete line of a chunked text stream
+const lineSplitter = (onLine) => {
+  let buffered = "";
+  return (chunk) => {
+    buffered += chunk.toString();
+    const lines = buffered.split("\n");
+    buffered = lines.pop();
+    lines.filter((line) => line.trim()).forEach(onLine);
+  };
+};
+
+// Streaming question generation. onEvent receives the `main.py --stream` NDJSON records:
+// { event: "question", question, completed, total } as each question is ready, then
+// exactly one { event: "done", count, ... } or { event: "error", error }.
+const streamQuestionGenerator = (params, onEvent) => {
+  let finished = false;
+  const emit = (event) => {
+    if (finished) return;
+    finished = event.event !== "question";
+    onEvent(event);
+  };
+  const fail = (message) => emit({ event: "error", error: message });
+
+  const invalid = invalidDistractorSource(params);
+  if (invalid) {
+    return fail(invalid);
+  }
+  if (process.env.QG_SERVER_URL) {
+    // Run it as a queued job on the warm server and translate its progress snapshots
+    fetch(`${process.env.QG_SERVER_URL}/jobs`, {
+      method: "POST",
+      headers: { "Content-Type": "application/json" },
+      body: JSON.stringify(params),
+    })
+      .then(async (response) => {
+        const job = await response.json();
+        if (!response.ok) {
+          return fail(job.error || `HTTP ${response.status}`);
+        }
+        const events = await fetch(`${process.env.QG_SERVER_URL}/jobs/${job.jobId}/events`);
+        const onSnapshot = lineSplitter((line) => {
+          const snapshot = JSON.parse(line);
+          const { completed, total } = snapshot.progress;
+          snapshot.questions.forEach((question) => emit({ event: "question", completed, total, question }));
+          if (snapshot.status === "done") {
+            const { questions, ...summary } = snapshot.result;
+            emit({ event: "done", count: questions.length, ...summary });
+          } else if (snapshot.status === "failed" || snapshot.status === "cancelled") {
+            fail(snapshot.error || `Job ${snapshot.status}`);
+          }
+        });
+        for await (const chunk of events.body) {
+          onSnapshot(Buffer.from(chunk));
+        }
+        fail("Question generation server closed the stream");
+      })
+      .catch((err) => fail(err.message));
+    return;
+  }
+
+  const args = params.file
+    ? ["main.py", "--file", params.file]
+    : ["main.py", "--topic", params.topic, "--subTopic", params.subTopic];
+  args.push("--questionType", params.questionType, "--numQuestions", String(params.numQuestions), "--stream");
+  if (params.profile) {
+    args.push("--profile", params.profile);
+  }
+  if (params.distractorSource) {
+    args.push("--distractors", params.distractorSource);
+  }
+  console.log("Running command:", ["python3", ...args].join(" "));
+
+  const child = spawn("python3", args, { cwd: __dirname });
+  let stderr = "";
+  child.stdout.on(
+    "data",
+    lineSplitter((line) => {
+      try {
+        emit(JSON.parse(line));
+      } catch (e) {
+        console.error("Unexpected question generator output:", line);
+      }
+    })
+  );
+  child.stderr.on("data", (chunk) => {
+    stderr += chunk.toString();
+  });
+  child.on("error", (err) => fail(err.message));
+  child.on("close", (code) => fail(stderr || `main.py exited with code ${code}`));
+};
+
+// Relays streamQuestionGenerator events to the client as NDJSON and saves the finished
+// questions with `save(questions)` before sending the final record
+const streamQuestionsToResponse = (res, params, save, onFinish = () => {}) => {
+  const questions = [];
+  res.status(200);
+  res.set("Content-Type", "application/x-ndjson");
+  res.set("Cache-Control", "no-cache");
+  res.flushHeaders();
+
+  streamQuestionGenerator(params, (event) => {
+    if (event.event === "question") {
+      questions.push(event.question);
+      res.write(JSON.stringify(event) + "\n");
+      return;
+    }
+    onFinish();
+    if (event.event === "error") {
+      console.error(`Error generating questions: ${event.error}`);
+      res.end(JSON.stringify({ event: "error", error: "Error generating questions" }) + "\n");
+      return;
+    }
+    save(questions)
+      .then(() => {
+        console.log("Questions saved");
+        res.end(JSON.stringify(event) + "\n");
+      })
+      .catch((err) => {
+        console.error("Error saving questions:", err);
+        res.end(JSON.stringify({ event: "error", error: "Error saving questions to database" }) + "\n");
+      });
+  });
+};
+
+const toStoredQuestions = (questions) =>
+  questions.map((q) => ({
+    questionType: q.questionType || "Unknown",
+    question: q.question || "No question",
+    options: q.options || [],
+    answer: q.answer || "No answer",
+  }));
+
 
 // Connect to MongoDB
 mongoose
@@ -415,24 +604,19 @@ app.post('/getmaxques', upload.single('file'), (req, res) => {
 
 // Generate Questions
 app.post("/api/generate-questions", (req, res) => {
-  const { topic, subTopic, questionType, numQuestions, email } = req.body;
+  const { topic, subTopic, questionType, numQuestions, email, profile, distractorSource } = req.body;
 
   if (!email) {
     return res.status(400).send({ error: "Email is required" });
   }
 
-  const command = `python3 main.py --topic "${topic}" --subTopic "${subTopic}" --questionType "${questionType}" --numQuestions ${numQuestions}`;
-  console.log("Running command:", command);
-
-  exec(command, (error, stdout, stderr) => {
+  runQuestionGenerator({ topic, subTopic, questionType, numQuestions, profile, distractorSource }, (error, result) => {
     if (error) {
-      console.error(`Error executing main1.py: ${stderr}`);
+      console.error(`Error generating questions: ${error.message}`);
       return res.status(500).send({ error: "Error generating questions" });
     }
 
     try {
-      const result = JSON.parse(stdout);
-
       const newQuestions = new Question({
         topic,
         subTopic,
@@ -464,11 +648,74 @@ app.post("/api/generate-questions", (req, res) => {
     }
   });
 });
+// Queued generation: submitting returns a job id at once, then clients poll
+// /api/jobs/:id (or stream /api/jobs/:id/events) for progress and questions.
+// Jobs run in the warm Python server, so these routes need QG_SERVER_URL.
+const forwardJobRequest = (req, res, jobPath, options = {}) => {
+  if (!process.env.QG_SERVER_URL) {
+    return res.status(503).send({ error: "Job queue requires QG_SERVER_URL" });
+  }
+  const query = new URLSearchParams(req.query).toString();
+  fetch(`${process.env.QG_SERVER_URL}${jobPath}${query ? `?${query}` : ""}`, options)
+    .then((response) => {
+      res.status(response.status);
+      res.set("Content-Type", response.headers.get("content-type") || "application/json");
+      Readable.fromWeb(response.body).pipe(res);
+    })
+    .catch((err) => {
+      console.error(`Error reaching question generation server: ${err.message}`);
+      res.status(502).send({ error: "Question generation server unavailable" });
+    });
+};
+
+app.post("/api/jobs", (req, res) => {
+  const { topic, subTopic, questionType, numQuestions, profile, distractorSource, priority } = req.body;
+  forwardJobRequest(req, res, "/jobs", {
+    method: "POST",
+    headers: { "Content-Type": "application/json" },
+    body: JSON.stringify({ topic, subTopic, questionType, numQuestions, profile, distractorSource, priority }),
+  });
+});
+
+app.get("/api/jobs/:id", (req, res) => {
+  forwardJobRequest(req, res, `/jobs/${encodeURIComponent(req.params.id)}`);
+});
+
+app.get("/api/jobs/:id/events", (req, res) => {
+  forwardJobRequest(req, res, `/jobs/${encodeURIComponent(req.params.id)}/events`);
+});
+
+app.delete("/api/jobs/:id", (req, res) => {
+  forwardJobRequest(req, res, `/jobs/${encodeURIComponent(req.params.id)}`, { method: "DELETE" });
+});
+
+// Same as /api/generate-questions, but each question is sent as an NDJSON record as soon
+// as it is generated instead of one JSON body at the end
+app.post("/api/generate-questions/stream", (req, res) => {
+  const { topic, subTopic, questionType, numQuestions, email, profile, distractorSource } = req.body;
+
+  if (!email) {
+    return res.status(400).send({ error: "Email is required" });
+  }
+
+  streamQuestionsToResponse(res, { topic, subTopic, questionType, numQuestions, profile, distractorSource }, (questions) =>
+    new Question({
+      topic,
+      subTopic,
+      questionType,
+      numQuestions,
+      sourceType: "non-pdf",
+      email,
+      questions: toStoredQuestions(questions),
+    }).save()
+  );
+});
+
 app.post(
-  "/api/upload-and-generate-questions",
+  "/api/upload-and-generate-questions/stream",
   upload.single("file"),
   (req, res) => {
-    const { questionType, numQuestions, email } = req.body;
+    const { questionType, numQuestions, email, profile, distractorSource } = req.body;
 
     if (!email) {
       return res.status(400).send({ error: "Email is required" });
@@ -479,20 +726,46 @@ app.post(
     }
 
     const filePath = path.resolve(req.file.path);
-    const command = `python3 main.py --file "${filePath}" --questionType "${questionType}" --numQuestions ${numQuestions}`;
-    console.log("Running command:", command);
+    streamQuestionsToResponse(
+      res,
+      { file: filePath, questionType, numQuestions, profile, distractorSource },
+      (questions) =>
+        new Submission({
+          questionType,
+          numQuestions,
+          sourceType: "pdf",
+          email,
+          questions: toStoredQuestions(questions),
+        }).save(),
+      () => fs.unlinkSync(filePath)
+    );
+  }
+);
 
-    exec(command, (error, stdout, stderr) => {
+app.post(
+  "/api/upload-and-generate-questions",
+  upload.single("file"),
+  (req, res) => {
+    const { questionType, numQuestions, email, profile, distractorSource } = req.body;
+
+    if (!email) {
+      return res.status(400).send({ error: "Email is required" });
+    }
+
+    if (!req.file) {
+      return res.status(400).send({ error: "No file uploaded" });
+    }
+
+    const filePath = path.resolve(req.file.path);
+    runQuestionGenerator({ file: filePath, questionType, numQuestions, profile, distractorSource }, (error, result) => {
       fs.unlinkSync(filePath);
 
       if (error) {
-        console.error(`Error executing main1.py: ${stderr}`);
+        console.error(`Error generating questions: ${error.message}`);
         return res.status(500).send({ error: "Error generating questions" });
       }
 
       try {
-        const result = JSON.parse(stdout);
-
         const newSubmission = new Submission({
           questionType,
           numQuestions,
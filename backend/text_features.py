@@ -0,0 +1,21 @@
+import re
+import zlib
+
+# Function words and page boilerplate that say nothing about a topic; shared by chunk
+# ranking, local distractors and question dedup so they agree on what a content word is
+STOPWORDS = frozenset("""
+a about above after again against all also an and any are as at be because been before being below between both
+but by can could did do does doing down during each either else few for from further had has have having he her
+here hers him his how however i if in into is it its itself just may might more most must my no nor not now of off
+on once only or other our out over own same she should so some such than that the their them then there these they
+this those through to too under until up upon very via was we were what when where which while who whom why will
+with within without would you your content title used use using called known one two three many much every
+whether example following
+""".split())
+
+WORD_RE = re.compile(r"[A-Za-z][A-Za-z0-9+#\-']*")
+
+
+# Bucket of a feature string in a hashed vector of `dim` columns
+def feature_hash(feature, dim):
+    return zlib.crc32(feature.encode('utf-8')) % dim
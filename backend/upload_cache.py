@@ -0,0 +1,124 @@
+import argparse
+import gzip
+import hashlib
+import json
+import os
+import shutil
+import time
+
+from chunk_index import CHUNK_SENTENCES
+from paths import CACHE_ROOT, temp_path
+
+CACHE_DIR = os.path.join(CACHE_ROOT, 'uploads')
+MAX_CACHE_BYTES = 256 * 1024 * 1024  # Least recently used entries are evicted above this
+CACHE_VERSION = 1
+
+
+# Content hash of an upload; multer's random file names differ for every re-upload
+def fingerprint(file_path):
+    digest = hashlib.sha256()
+    with open(file_path, 'rb') as f:
+        for block in iter(lambda: f.read(1 << 20), b''):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def _entry_path(key, max_sentences_per_chunk, cache_dir):
+    return os.path.join(cache_dir, f"{key}-{max_sentences_per_chunk}.json.gz")
+
+
+def read_entry(key, max_sentences_per_chunk=CHUNK_SENTENCES, cache_dir=CACHE_DIR):
+    path = _entry_path(key, max_sentences_per_chunk, cache_dir)
+    try:
+        with gzip.open(path, 'rt', encoding='utf-8') as f:
+            entry = json.load(f)
+        if entry.get('version') != CACHE_VERSION:
+            return None
+        os.utime(path)  # mtime doubles as the last-access time for eviction
+    except (OSError, ValueError):
+        return None  # Missing, unreadable, or evicted by another process meanwhile
+    return entry
+
+
+def write_entry(entry, cache_dir=CACHE_DIR, max_bytes=MAX_CACHE_BYTES):
+    os.makedirs(cache_dir, exist_ok=True)
+    path = _entry_path(entry['fingerprint'], entry['max_sentences_per_chunk'], cache_dir)
+    tmp_path = temp_path(path)
+    try:
+        with gzip.open(tmp_path, 'wt', encoding='utf-8') as f:
+            json.dump(entry, f, separators=(',', ':'))
+        os.replace(tmp_path, path)
+    finally:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+    evict(cache_dir, max_bytes)
+
+
+# Drop least recently used entries until the directory fits in max_bytes
+def evict(cache_dir=CACHE_DIR, max_bytes=MAX_CACHE_BYTES):
+    entries = []
+    for name in os.listdir(cache_dir):
+        if name.endswith('.json.gz'):
+            try:
+                stat = os.stat(os.path.join(cache_dir, name))
+            except FileNotFoundError:
+                continue  # Evicted by another process
+            entries.append((stat.st_mtime, stat.st_size, name))
+    total = sum(size for _, size, _ in entries)
+    for _, size, name in sorted(entries):
+        if total <= max_bytes:
+            break
+        try:
+            os.remove(os.path.join(cache_dir, name))
+        except FileNotFoundError:
+            pass
+        total -= size
+
+
+def make_entry(key, max_sentences_per_chunk, chunks, complete, pages_processed, total_pages):
+    return {
+        "version": CACHE_VERSION,
+        "fingerprint": key,
+        "max_sentences_per_chunk": max_sentences_per_chunk,
+        "chunks": chunks,
+        "complete": complete,  # False when extraction stopped early; chunks is then a prefix
+        "pages_processed": pages_processed,
+        "total_pages": total_pages,
+        "created_at": time.time()
+    }
+
+
+# First `limit` chunks of an uploaded PDF (all when limit is None) and extraction stats.
+# A cached entry answers the request if it is complete or already long enough; otherwise
+# the PDF is streamed and whatever was extracted is stored for the next caller.
+def get_chunks(file_path, limit=None, max_sentences_per_chunk=CHUNK_SENTENCES, cache_dir=CACHE_DIR):
+    key = fingerprint(file_path)
+    entry = read_entry(key, max_sentences_per_chunk, cache_dir)
+    if entry and (entry['complete'] or (limit is not None and len(entry['chunks']) >= limit)):
+        chunks = entry['chunks'] if limit is None else entry['chunks'][:limit]
+        return chunks, {"pages_processed": 0, "total_pages": entry['total_pages'], "cached": True}
+
+    from pdf_stream import PdfChunkStream  # Only a cache miss needs PyPDF2 and NLTK
+    stream = PdfChunkStream(file_path, max_sentences_per_chunk)
+    chunks = stream.take(limit)
+    complete = limit is None or len(chunks) < limit
+    if entry is None or complete or len(chunks) > len(entry['chunks']):
+        write_entry(make_entry(key, max_sentences_per_chunk, chunks, complete, stream.pages_processed, stream.total_pages), cache_dir)
+    return chunks, {**stream.stats(), "cached": False}
+
+
+def clear(cache_dir=CACHE_DIR):
+    shutil.rmtree(cache_dir, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Extract an uploaded PDF into the upload cache, or clear the cache")
+    parser.add_argument('--file', help="PDF to extract and cache")
+    parser.add_argument('--clear', action='store_true', help="Remove every cached upload")
+
+    args = parser.parse_args()
+    if args.clear:
+        clear()
+    if args.file:
+        chunks, stats = get_chunks(args.file)
+        print(json.dumps({"fingerprint": fingerprint(args.file), "chunks": len(chunks), **stats}, indent=2))
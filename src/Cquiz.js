@@ -196,6 +196,7 @@ import React, { useState } from 'react';
 import { useNavigate } from 'react-router-dom';
 import Header from './components/header';
 import Footer from './components/footer';
+import { readQuestionStream } from './questionStream';
 
 const Cquiz = () => {
   const [file, setFile] = useState(null);
@@ -282,14 +283,18 @@ const Cquiz = () => {
     formData.append('email', email);
 
     try {
-      const response = await fetch('http://localhost:5001/api/upload-and-generate-questions', {
+      // Questions are shown as they arrive; the rest keep generating in the background
+      const response = await fetch('http://localhost:5001/api/upload-and-generate-questions/stream', {
         method: 'POST',
         body: formData,
       });
 
       if (response.ok) {
-        const data = await response.json();
-        setQuestions(data.questions || []);
+        setQuestions([]);
+        setCurrentQuestionIndex(0);
+        await readQuestionStream(response, (question) => {
+          setQuestions((previous) => [...previous, question]);
+        });
         setError('');
       } else {
         const errorText = await response.text();
@@ -384,7 +389,7 @@ const Cquiz = () => {
           Generated Questions on Uploaded Document
         </h5>
         <div style={styles.container}>
-          {loading ? (
+          {loading && questions.length === 0 ? (
             <div style={styles.loadingText}>Loading...</div>
           ) : questions.length === 0 ? (
             <p style={styles.noQuestionsText}>No questions to display.</p>
@@ -182,6 +182,7 @@
 import React, { useState, useEffect } from 'react';
 import Header from './components/header';
 import Footer from './components/footer';
+import { readQuestionStream } from './questionStream';
 
 const Quiz = () => {
     const [topic, setTopic] = useState('');
@@ -288,17 +289,18 @@ const Quiz = () => {
                 return;
             }
 
-            const response = await fetch('http://localhost:5001/api/generate-questions', {
+            // Questions are shown as they arrive; the rest keep generating in the background
+            const response = await fetch('http://localhost:5001/api/generate-questions/stream', {
                 method: 'POST',
                 headers: { 'Content-Type': 'application/json' },
                 body: JSON.stringify({ topic, subTopic, questionType, numQuestions, email }),
             });
 
             if (response.ok) {
-                const data = await response.json();
-                if (data && Array.isArray(data.questions)) {
-                    setQuestions(data.questions);
-                } else {
+                const summary = await readQuestionStream(response, (question) => {
+                    setQuestions((previous) => [...previous, question]);
+                });
+                if (summary.count === 0) {
                     setError('No questions generated or invalid response format.');
                 }
             } else {
@@ -363,7 +365,7 @@ const Quiz = () => {
                 <hr style={styles.blackLine} />
                 <h5 style={{ marginBottom: '10px', textAlign: 'center', color: '#333' }}>Generated Questions on Selected Topic</h5>
                  <div style={styles.container}>
-                    {loading ? (
+                    {loading && questions.length === 0 ? (
                         <div style={styles.loadingText}>Loading...</div>  // Display loading text or spinner
                     ) : questions.length === 0 ? (
                         <p style={styles.noQuestionsText}>No questions to display.</p>
@@ -0,0 +1,33 @@
+// Reads the NDJSON stream from the /stream generation endpoints. onQuestion is called
+// with each question as soon as it arrives; resolves with the final "done" record and
+// rejects on an "error" record.
+export const readQuestionStream = async (response, onQuestion) => {
+    const reader = response.body.getReader();
+    const decoder = new TextDecoder();
+    let buffered = '';
+
+    while (true) {
+        const { value, done } = await reader.read();
+        if (done) {
+            break;
+        }
+        buffered += decoder.decode(value, { stream: true });
+        const lines = buffered.split('\n');
+        buffered = lines.pop();
+
+        for (const line of lines) {
+            if (!line.trim()) {
+                continue;
+            }
+            const event = JSON.parse(line);
+            if (event.event === 'question') {
+                onQuestion(event.question);
+            } else if (event.event === 'error') {
+                throw new Error(event.error);
+            } else if (event.event === 'done') {
+                return event;
+            }
+        }
+    }
+    throw new Error('Question stream ended unexpectedly');
+};